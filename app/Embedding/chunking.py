@@ -9,19 +9,52 @@ class Chunking:
         pass
 
 
-    def recursive_text_splitter(self,docs:List[Document],chunk_size:int = 500,chunk_overlap:int=100,is_separator_regex:bool=False):
+    def recursive_text_splitter(self,docs:List[Document],chunk_size:int = 500,chunk_overlap:int=100,is_separator_regex:bool=False,merge_small_chunks:bool = True):
         print("Started Chunking Process")
         try:
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap,
                 length_function = len,
-                is_separator_regex = is_separator_regex)
+                is_separator_regex = is_separator_regex,
+                add_start_index = merge_small_chunks)
 
-            chunked_document = text_splitter.split_documents(docs)
+            chunked_document = []
+            for doc in docs:
+                chunks = text_splitter.split_documents([doc])
+                if merge_small_chunks:
+                    chunks = self._merge_small_chunks(doc.page_content, chunks, chunk_size)
+                # Chunks inherit the source document's length; record their own once here
+                for chunk in chunks:
+                    chunk.metadata['content_length'] = len(chunk.page_content)
+                chunked_document.extend(chunks)
         except Exception as e:
             raise ValueError("Error in Text Splitter",e)
         
         return chunked_document
 
-#Note: Will add more chunking methods later
\ No newline at end of file
+    def _merge_small_chunks(self,text:str,chunks:List[Document],chunk_size:int,min_chunk_size:int = 100) -> List[Document]:
+        """
+        Second pass over the splitter output of one document: greedily merge
+        adjacent chunks so we don't embed long tails of tiny chunks.
+        """
+        max_size = int(chunk_size * 1.1)
+        # Tiny chunks get a little extra room to be absorbed by a neighbour
+        tiny_max_size = int(chunk_size * 1.15)
+
+        merged = []
+        for chunk in chunks:
+            start = chunk.metadata.pop("start_index", -1)
+            if merged and start >= 0 and merged[-1][0] >= 0:
+                prev_start, prev = merged[-1]
+                end = start + len(chunk.page_content)
+                is_tiny = min(len(prev.page_content), len(chunk.page_content)) < min_chunk_size
+                if end - prev_start <= (tiny_max_size if is_tiny else max_size):
+                    # Slice the source text so the overlap between the two isn't duplicated
+                    prev.page_content = text[prev_start:end]
+                    continue
+            merged.append((start, chunk))
+
+        return [chunk for _, chunk in merged]
+
+#Note: Will add more chunking methods later
@@ -1,47 +1,88 @@
-from typing import List, Tuple
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 from functools import lru_cache
 
 
 class EmbeddingManager:
 
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
+    def __init__(self, model_name="all-MiniLM-L6-v2", batch_size: int = 64, backend: str = "torch", artifact_dir: Optional[str] = None):
         self.model_name = model_name
+        # Local copy of the model (safetensors + tokenizer) written after the first
+        # hub load; later starts read it from disk with no hub round-trips
+        self.artifact_dir = Path(artifact_dir or os.getenv("APP_CACHE", "../data/model_cache")).resolve() / model_name.replace("/", "__")
+        self.batch_size = batch_size
+        # "torch" (default) or "onnx" for the ONNX Runtime graph, faster on CPU
+        self.backend = backend
         self.model = None
+        self._device = "cpu"
         self._load_model()
-        # Simple query cache for repeated queries
-        self._query_cache = {}
-        self._cache_max_size = 100
+        # LRU cache for repeated single queries (true LRU, C-implemented)
+        self._embed_one = lru_cache(maxsize=1024)(self._encode_single)
+
+    def _save_artifact(self):
+        try:
+            self.model.save(str(self.artifact_dir), safe_serialization=True)
+            print(f"💾 Saved embedding model artifact to {self.artifact_dir}")
+        except Exception as e:
+            print(f"⚠️ Could not save embedding model artifact: {e}")
+
+    @property
+    def dimension(self) -> int:
+        """Size of the vectors produced by the model."""
+        return self.model.get_sentence_embedding_dimension()
 
     def _load_model(self):
         try:
-            self.model = SentenceTransformer(self.model_name)
-            print(f"✅ Loaded embedding model: {self.model_name}")
-            print(f"📐 Embedding dimension: {self.model.get_sentence_embedding_dimension()}")
+            has_artifact = self.backend == "torch" and (self.artifact_dir / "modules.json").exists()
+            self.model = SentenceTransformer(str(self.artifact_dir) if has_artifact else self.model_name, backend=self.backend)
+            if self.backend == "torch" and not has_artifact:
+                self._save_artifact()
+            # Run in FP16 on GPU; encoding stays on device until the final copy back
+            if self.backend == "torch" and torch.cuda.is_available():
+                self.model = self.model.to("cuda").half()
+                self._device = "cuda"
+            print(f"✅ Loaded embedding model: {self.model_name} ({self.backend})")
+            print(f"📐 Embedding dimension: {self.dimension}")
+            print(f"🖥️ Embedding device: {self._device}")
         except Exception as e:
             raise ValueError(f"Error loading model: {e}")
     
-    def generate_embedding(self, texts: List[str]) -> np.ndarray:
+    def generate_embedding(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """Generate embeddings with caching for single queries."""
         if not self.model:
             raise ValueError("Model not initiated")
         
-        # For single query, try cache first
+        # For single query, go through the cache
         if len(texts) == 1:
-            cache_key = texts[0]
-            if cache_key in self._query_cache:
-                return np.array([self._query_cache[cache_key]])
+            return np.array([self._embed_one(texts[0])])
         
+        # Duplicate chunks are already dropped across the whole ingest by
+        # _process_and_index_core, so they are not checked again here
+        return self._encode(texts, batch_size)
+
+    def _encode_single(self, text: str) -> np.ndarray:
+        return self._encode([text])[0]
+
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         print(f"🔄 Generating embeddings for {len(texts)} text(s)...")
-        embeddings = self.model.encode(texts, show_progress_bar=len(texts) > 5)
-        
-        # Cache single queries
-        if len(texts) == 1:
-            if len(self._query_cache) >= self._cache_max_size:
-                # Remove oldest entry
-                self._query_cache.pop(next(iter(self._query_cache)))
-            self._query_cache[texts[0]] = embeddings[0]
+        # Sort by length so every batch pads to a similar size, then scatter back
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_texts = [texts[i] for i in order]
+        sorted_embeddings = self.model.encode(
+            sorted_texts,
+            batch_size=batch_size or self.batch_size,
+            show_progress_bar=len(texts) > 5,
+            convert_to_tensor=True,
+            device=self._device,
+            normalize_embeddings=True
+        )
+        # Single device -> host copy, back to float32 for the vector store
+        sorted_embeddings = sorted_embeddings.float().cpu().numpy()
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
         
         return embeddings
-
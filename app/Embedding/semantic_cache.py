@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+import numpy as np
+
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+def _best_match_numpy(q_codes: np.ndarray, q_scale: float, codes: np.ndarray, scales: np.ndarray) -> Tuple[int, float]:
+    scores = (codes.astype(np.int32) @ q_codes.astype(np.int32)) * scales * q_scale
+    best = int(np.argmax(scores))
+    return best, float(scores[best])
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _best_match_numba(q_codes, q_scale, codes, scales):
+        n, d = codes.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = 0
+            for j in range(d):
+                acc += np.int32(codes[i, j]) * np.int32(q_codes[j])
+            scores[i] = acc * scales[i] * q_scale
+        best = np.argmax(scores)
+        return best, scores[best]
+
+    def _best_match(q_codes: np.ndarray, q_scale: float, codes: np.ndarray, scales: np.ndarray) -> Tuple[int, float]:
+        best, score = _best_match_numba(q_codes, q_scale, codes, scales)
+        return int(best), float(score)
+
+    # Compile once at import so the first real lookup doesn't pay for it
+    _best_match(np.zeros(4, dtype=np.int8), 1.0, np.zeros((1, 4), dtype=np.int8), np.ones(1, dtype=np.float32))
+else:
+    _best_match = _best_match_numpy
+
+
+def _quantize_int8(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Symmetric int8 quantization of a single vector: v ~= codes * scale."""
+    scale = float(np.max(np.abs(embedding))) / 127 or 1.0
+    codes = np.round(embedding / scale).astype(np.int8)
+    return codes, scale
+
+
+class SemanticCache:
+    """
+    Small in-memory cache keyed on embedding similarity instead of exact text,
+    so near-paraphrased queries can reuse an earlier result.
+    Keys are stored as int8 codes with a per-vector scale (4x smaller than float32).
+    With persist_dir set, entries are reloaded on start and flushed to disk in
+    the background and by close(), so the cache survives restarts. The data version is saved
+    with them, so a reloaded cache is discarded by sync_version() if the data
+    changed meanwhile. Values must be JSON-serializable.
+    """
+
+    def __init__(self, threshold: float = 0.97, max_size: int = 1024, persist_dir: Optional[str] = None, flush_interval: float = 30.0):
+        self.threshold = threshold
+        self.max_size = max_size
+        # (max_size, dim) int8 codes of L2-normalized keys, allocated on first add
+        self._codes: Optional[np.ndarray] = None
+        self._scales = np.zeros(max_size, dtype=np.float32)
+        self._values: List[Any] = [None] * max_size
+        self._last_used = np.zeros(max_size, dtype=np.int64)
+        self._size = 0
+        self._tick = 0
+        self._dirty = False
+        # Bumped on every change, so save() only marks clean what it wrote
+        self._revision = 0
+        self._lock = threading.Lock()
+        # One writer at a time for the temp files (flush thread vs close())
+        self._save_lock = threading.Lock()
+        self._closed = threading.Event()
+        # Version of the data the cached values were computed from
+        self.version: Optional[str] = None
+
+        self.persist_dir = Path(persist_dir).resolve() if persist_dir else None
+        if self.persist_dir:
+            self.load()
+            threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True).start()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        q = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def lookup(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the cached value of the most similar key above the threshold."""
+        if not self._size:
+            return None
+
+        q_codes, q_scale = _quantize_int8(self._normalize(embedding))
+        with self._lock:
+            n = self._size
+            best, score = _best_match(q_codes, q_scale, self._codes[:n], self._scales[:n])
+            if score < self.threshold:
+                return None
+
+            self._tick += 1
+            self._last_used[best] = self._tick
+            return self._values[best]
+
+    def add(self, embedding: np.ndarray, value: Any):
+        """Store a value, evicting the least recently used entry when full."""
+        codes, scale = _quantize_int8(self._normalize(embedding))
+        with self._lock:
+            if self._codes is None:
+                self._codes = np.zeros((self.max_size, codes.shape[0]), dtype=np.int8)
+
+            if self._size < self.max_size:
+                idx = self._size
+                self._size += 1
+            else:
+                idx = int(np.argmin(self._last_used))
+
+            self._codes[idx] = codes
+            self._scales[idx] = scale
+            self._values[idx] = value
+            self._tick += 1
+            self._last_used[idx] = self._tick
+            self._dirty = True
+            self._revision += 1
+
+    def clear(self, version: Optional[str] = None):
+        with self._lock:
+            self._values = [None] * self.max_size
+            self._last_used[:] = 0
+            self._size = 0
+            if version is not None:
+                self.version = version
+            self._dirty = True
+            self._revision += 1
+
+    def sync_version(self, version: str):
+        """Drop every entry if the data they were computed from has changed."""
+        if version != self.version:
+            # Same lock as save(), so a snapshot never pairs old entries with the new version
+            self.clear(version)
+
+    def save(self):
+        """Write keys (npz) and values (json) to persist_dir, replacing the old files."""
+        if not self.persist_dir:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                n = self._size
+                codes = self._codes[:n].copy() if self._codes is not None else np.zeros((0, 0), dtype=np.int8)
+                scales = self._scales[:n].copy()
+                last_used = self._last_used[:n].copy()
+                meta = {"tick": self._tick, "version": self.version, "values": self._values[:n]}
+                revision = self._revision
+
+            os.makedirs(self.persist_dir, exist_ok=True)
+            np.savez(self.persist_dir / "keys.tmp.npz", codes=codes, scales=scales, last_used=last_used)
+            with open(self.persist_dir / "values.tmp.json", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(self.persist_dir / "keys.tmp.npz", self.persist_dir / "keys.npz")
+            os.replace(self.persist_dir / "values.tmp.json", self.persist_dir / "values.json")
+
+            # Only now is the snapshot on disk; changes made while writing stay dirty
+            with self._lock:
+                if self._revision == revision:
+                    self._dirty = False
+
+    def close(self):
+        """Stop the background flush and write any unsaved entries. Call on shutdown."""
+        self._closed.set()
+        if self.persist_dir and self._dirty:
+            self.save()
+
+    def load(self):
+        """Restore entries previously written by save(), if any."""
+        keys_path = self.persist_dir / "keys.npz"
+        values_path = self.persist_dir / "values.json"
+        if not keys_path.exists() or not values_path.exists():
+            return
+
+        try:
+            with np.load(keys_path) as data:
+                codes, scales, last_used = data["codes"], data["scales"], data["last_used"]
+            with open(values_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not load query cache: {e}")
+            return
+
+        n = min(len(codes), len(meta["values"]), self.max_size)
+        with self._lock:
+            if n:
+                self._codes = np.zeros((self.max_size, codes.shape[1]), dtype=np.int8)
+                self._codes[:n] = codes[:n]
+                self._scales[:n] = scales[:n]
+                self._last_used[:n] = last_used[:n]
+                self._values[:n] = meta["values"][:n]
+            self._size = n
+            self._tick = meta["tick"]
+            # Files without a version predate it and are dropped on the first sync_version()
+            self.version = meta.get("version")
+        print(f"✅ Loaded {n} cached queries from {self.persist_dir}")
+
+    def _flush_loop(self, interval: float):
+        while not self._closed.wait(interval):
+            if self._dirty:
+                try:
+                    self.save()
+                except Exception as e:
+                    print(f"⚠️ Could not persist query cache: {e}")
@@ -1,8 +1,8 @@
 import os
+import threading
 from pathlib import Path
 from typing import Any, List
 import chromadb
-import uuid
 import numpy as np
 
 class VectorStore:
@@ -18,6 +18,10 @@ class VectorStore:
 
         self.client = None
         self.collection = None
+        # Bumped by every write; version is only re-read from the store after one
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._version = (-1, "")
         self._initialize_store()
     
     def _initialize_store(self):
@@ -25,51 +29,92 @@ class VectorStore:
             os.makedirs(self.persist_dir,exist_ok = True)
             self.client = chromadb.PersistentClient(path=self.persist_dir)
 
-            self.collection=self.client.get_or_create_collection(
-                name = self.collection_name,
-                metadata={"description":"PDF embeddings for RAG"})
+            self.collection = self._get_or_create_collection()
             print("Vector store has been Initialized for Collection:",{self.collection_name})
 
         except Exception as e:
             raise ValueError("error in Vector Store initializing",e)
         
-    def add_documents(self,documents:List[Any],embeddings:np.ndarray):
+    def _get_or_create_collection(self):
+        return self.client.get_or_create_collection(
+            name = self.collection_name,
+            metadata={"description":"PDF embeddings for RAG"})
+
+    def _bump_generation(self):
+        with self._generation_lock:
+            self._generation += 1
+
+    @property
+    def version(self) -> str:
+        """
+        Changes whenever the stored data does: the collection id is new after
+        clear() recreates it, and the count moves on every ingest. Read from the
+        store once per write generation, so queries don't pay a count() each.
+        """
+        generation, version = self._version
+        if generation != self._generation:
+            generation = self._generation
+            version = f"{self.collection.id}:{self.collection.count()}"
+            self._version = (generation, version)
+        return version
+
+    def clear(self) -> int:
+        """
+        Remove every stored vector by dropping and recreating the collection,
+        without fetching all ids first. Returns the number of documents removed.
+        """
+        count = max(0, self.collection.count())
+        if count > 0:
+            try:
+                self.client.delete_collection(self.collection_name)
+                self.collection = self._get_or_create_collection()
+            finally:
+                self._bump_generation()
+        return count
+        
+    def add_documents(self,documents:List[Any],embeddings:np.ndarray,batch_size:int = 200,start_index:int = 0):
+        """
+        Store documents with their (N, dim) embedding matrix, in insert batches.
+        start_index offsets doc_index when a larger ingest is added in slices.
+        """
 
         if(len(documents)!=len(embeddings)):
             raise ValueError("Error")
         
-        ids = []
-        metadatas=[]
-        document_text = []
-        embedding_list = []
-
-        for i,(doc,embed) in enumerate(zip(documents,embeddings)):
-            doc_id = f"doc_{uuid.uuid4().hex[:8]}_{i}"
-            ids.append(doc_id)
+        # Parallel arrays: ids, metadatas and texts as lists, embeddings as one
+        # contiguous float32 matrix converted to lists per insert batch below
+        # (no copy when the caller already passes one)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
-            metadata = dict(doc.metadata)
-            metadata['doc_index'] = i
-            metadata['content_length'] = len(doc.page_content)
+        # One urandom call for the whole batch instead of a uuid4() per document
+        rand = os.urandom(4 * len(documents)).hex()
 
-            metadatas.append(metadata)
-            document_text.append(doc.page_content)
-            
-            embedding_list.append(embed.tolist())
+        ids = [f"doc_{rand[i*8:(i+1)*8]}_{start_index + i}" for i in range(len(documents))]
+        metadatas = [
+            {**doc.metadata, 'doc_index': start_index + i, 'content_length': len(doc.page_content)}
+            for i, doc in enumerate(documents)
+        ]
+        document_text = [doc.page_content for doc in documents]
 
-        if not documents or not embedding_list:
+        if not documents or not len(embeddings):
             raise ValueError("Documents or embeddings are empty")
 
-        if not ids and not metadatas and not documents and not embedding_list:
+        if not ids and not metadatas and not documents:
             raise ValueError("Error")
         try:
-            self.collection.add(
-                ids = ids,
-                metadatas=metadatas,
-                documents=document_text,
-                embeddings=embedding_list
-
-            )
+            # Insert in slices; one giant add() is much slower and holds everything in memory
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                self.collection.add(
+                    ids = ids[start:end],
+                    metadatas=metadatas[start:end],
+                    documents=document_text[start:end],
+                    embeddings=embeddings[start:end].tolist()
+                )
         except Exception as e:
             raise ValueError(e)
+        finally:
+            # Even a failed ingest may have stored some batches
+            self._bump_generation()
     
 
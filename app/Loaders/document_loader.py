@@ -1,12 +1,57 @@
 
 # for plain text pdfs
+import csv
 import datetime
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, List, Tuple
 from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_community.document_loaders.parsers import PyMuPDFParser
 from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
 from langchain_community.document_loaders.csv_loader import CSVLoader 
 
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Worker pool shared by every DocumentLoader, created on first use and kept.
+    Workers come from a forkserver (spawn where that is unavailable), never a
+    plain fork of the multi-threaded API process and the torch/Chroma state it holds.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _reset_pool():
+    """Drop a pool whose worker died so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def shutdown_pool():
+    """Stop the worker processes and cancel queued work. Call on app shutdown."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
 class DocumentLoader:
     """ For PDF's(Only Text) and CSV's"""
     def __init__(self):
@@ -16,16 +61,19 @@ class DocumentLoader:
             'failed': 0
         }
 
-    def _enrich_metadata(self, doc: Document, file_path: Path, file_type: str,additional_metadata: Optional[Dict[str, Any]] = None) -> Document:
+    @staticmethod
+    def _enrich_metadata(doc: Document, file_path: Path, file_type: str,additional_metadata: Optional[Dict[str, Any]] = None,file_size_bytes: Optional[int] = None) -> Document:
         """
         Enrich document metadata with standard and custom fields.
+        Pass file_size_bytes for in-memory files that have no path on disk.
         """
 
+        in_memory = file_size_bytes is not None
         doc.metadata.update({
             'source_file': file_path.name,
-            'source_path': str(file_path.absolute()),
+            'source_path': file_path.name if in_memory else str(file_path.absolute()),
             'file_type': file_type,
-            'file_size_bytes': file_path.stat().st_size,
+            'file_size_bytes': file_size_bytes if in_memory else file_path.stat().st_size,
             'ingested_at': str(datetime.datetime.now().isoformat()),
             'content_length': len(doc.page_content)
         })
@@ -50,43 +98,37 @@ class DocumentLoader:
 
         self.stats['total_files']+=len(pdf_files)
 
-        for idx,pdf_path in enumerate(pdf_files):
-            try:
-                loader = PyMuPDFLoader(
-                    file_path=str(pdf_path),
-                    mode = "page",
-                    extract_images=True,
-                    extract_tables='markdown'
-                )
-
-                documents = loader.load()
-
-                if not documents:
-                    raise ValueError("Error Extracting Documents")
-
-
-                for doc_id,doc in enumerate(documents):
-                    page_metadata = {'page_number':doc_id+1}
-
-                    if additional_metadata:
-                        page_metadata.update(additional_metadata)
-
-
-                    self._enrich_metadata(doc, pdf_path, 'pdf', page_metadata)
-                    doc.page_content = doc.page_content.strip()
-                    if doc.page_content:
-                        all_docs.append(doc)
-                
-                self.stats['sucessfull']+=1
-                self.stats['total_files']+=1
-                
-            except Exception as e:
+        # Files are parsed in worker processes; PyMuPDF parsing is CPU-bound
+        for pdf_path, documents, error in self._run_per_file(_load_one_pdf, pdf_files, additional_metadata):
+            if error is not None:
                 self.stats['failed']+=1
-                raise ValueError("Exception Occured",e)
+                raise ValueError("Exception Occured",error)
+
+            all_docs.extend(documents)
+            self.stats['sucessfull']+=1
+            self.stats['total_files']+=1
             
         print("Loaded Documents")
         return all_docs
 
+    def load_pdf_bytes(self,data:bytes,filename:str,additional_metadata:Optional[Dict[str,Any]] = None) -> List[Document]:
+        """Load a PDF held in memory (e.g. a small upload) without writing it to disk."""
+        self.stats['total_files']+=1
+        try:
+            parser = PyMuPDFParser(
+                mode = "page",
+                extract_images=True,
+                extract_tables='markdown'
+            )
+            documents = list(parser.lazy_parse(Blob.from_data(data, path=filename, mime_type="application/pdf")))
+            docs = _prepare_pdf_pages(documents, Path(filename), additional_metadata, file_size_bytes=len(data))
+        except Exception as e:
+            self.stats['failed']+=1
+            raise ValueError("Exception Occured",e)
+
+        self.stats['sucessfull']+=1
+        return docs
+
     def load_csvs(self,csv_dir: str,delimiter: str = ",",encoding: str = "utf-8",recursive: bool = True,source_column: Optional[str] = None,additional_metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """
@@ -112,42 +154,25 @@ class DocumentLoader:
         
         self.stats['total_files'] += len(csv_files)
         
-        # Process each CSV
-        for idx, csv_path in enumerate(csv_files, 1):
+        csv_args = {
+            "delimiter": delimiter,
+            "quotechar": '"'
+        }
+        
+        # Process each CSV (in worker processes when there are several)
+        for csv_path, loaded, error in self._run_per_file(_load_one_csv, csv_files, encoding, source_column, csv_args, additional_metadata):
             try:
-                csv_args = {
-                    "delimiter": delimiter,
-                    "quotechar": '"'
-                }
-                
-                # Load CSV
-                loader = CSVLoader(
-                    file_path=str(csv_path),
-                    encoding=encoding,
-                    source_column=source_column,
-                    csv_args=csv_args
-                )
-                
-                documents = loader.load()
-                
-                if not documents:
+                if error is not None:
+                    raise error
+
+                documents, loaded_count = loaded
+                if not loaded_count:
                     print("No documents Loaded")
                     continue
                 
-                for doc_idx, doc in enumerate(documents):
-                    row_metadata = {'row_number': doc_idx + 1}
-                    if additional_metadata:
-                        row_metadata.update(additional_metadata)
-                    
-                    self._enrich_metadata(doc, csv_path, 'csv', row_metadata)
-                    
-                    doc.page_content = doc.page_content.strip()
-                    
-                    if doc.page_content:
-                        all_docs.append(doc)
-                
+                all_docs.extend(documents)
                 self.stats['successful'] += 1
-                self.stats['total_docs'] += len(documents)
+                self.stats['total_docs'] += loaded_count
                 
             except Exception as e:
                 self.stats['failed'] += 1
@@ -155,6 +180,80 @@ class DocumentLoader:
         
         return all_docs
     
+    def load_csv_stream(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        delimiter: str = ",",
+        encoding: str = "utf-8",
+        source_column: Optional[str] = None,
+        additional_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        Load a CSV straight from a binary file-like object (e.g. an upload),
+        without writing it to disk. Rows are formatted the same way as CSVLoader,
+        and rows with no content are skipped, as in load_csvs.
+        """
+        self.stats['total_files'] += 1
+        try:
+            file_obj.seek(0, io.SEEK_END)
+            file_size = file_obj.tell()
+            file_obj.seek(0)
+
+            text = io.TextIOWrapper(file_obj, encoding=encoding, newline="")
+            try:
+                reader = csv.DictReader(text, delimiter=delimiter, quotechar='"')
+                docs = []
+                for doc_idx, row in enumerate(reader):
+                    content = _format_csv_row(row)
+                    if not content:
+                        continue
+
+                    source = row[source_column] if source_column else filename
+                    row_metadata = {'row_number': doc_idx + 1}
+                    if additional_metadata:
+                        row_metadata.update(additional_metadata)
+
+                    doc = Document(page_content=content, metadata={'source': source, 'row': doc_idx})
+                    docs.append(self._enrich_metadata(doc, Path(filename), 'csv', row_metadata, file_size))
+            finally:
+                # Don't let the wrapper close the caller's file
+                text.detach()
+        except Exception as e:
+            self.stats['failed'] += 1
+            raise ValueError("Exception Occured",e)
+
+        self.stats['sucessfull'] += 1
+        return docs
+    
+    def _run_per_file(self, fn: Callable, files: List[Path], *args) -> Iterator[Tuple[Path, Any, Optional[Exception]]]:
+        """
+        Run fn(str(path), *args) for every file, in a process pool when there is
+        more than one file. Yields (path, result, error) in input order.
+        """
+        if len(files) == 1:
+            try:
+                yield files[0], fn(str(files[0]), *args), None
+            except Exception as e:
+                yield files[0], None, e
+            return
+
+        futures = [_get_pool().submit(fn, str(path), *args) for path in files]
+        try:
+            for path, future in zip(files, futures):
+                try:
+                    yield path, future.result(), None
+                except BrokenProcessPool as e:
+                    _reset_pool()
+                    yield path, None, e
+                except Exception as e:
+                    yield path, None, e
+        finally:
+            # The pool outlives this call; don't leave queued work behind if the
+            # caller stops early (load_pdfs raises on the first failure)
+            for future in futures:
+                future.cancel()
+    
     def get_stats(self) -> Dict[str, int]:
         """Return loading statistics."""
         return self.stats.copy()
@@ -166,4 +265,80 @@ class DocumentLoader:
             'successful': 0,
             'failed': 0,
             'total_docs': 0
-        }
\ No newline at end of file
+        }
+
+
+# Module-level so they can be pickled into worker processes
+
+def _load_one_pdf(pdf_path_str: str, additional_metadata: Optional[Dict[str, Any]] = None) -> List[Document]:
+    pdf_path = Path(pdf_path_str)
+    loader = PyMuPDFLoader(
+        file_path=pdf_path_str,
+        mode = "page",
+        extract_images=True,
+        extract_tables='markdown'
+    )
+
+    return _prepare_pdf_pages(loader.load(), pdf_path, additional_metadata)
+
+
+def _prepare_pdf_pages(documents: List[Document], pdf_path: Path, additional_metadata: Optional[Dict[str, Any]] = None, file_size_bytes: Optional[int] = None) -> List[Document]:
+    if not documents:
+        raise ValueError("Error Extracting Documents")
+
+    docs = []
+    for doc_id,doc in enumerate(documents):
+        page_metadata = {'page_number':doc_id+1}
+
+        if additional_metadata:
+            page_metadata.update(additional_metadata)
+
+        # Strip first so the recorded content_length matches the stored text
+        doc.page_content = doc.page_content.strip()
+        if doc.page_content:
+            DocumentLoader._enrich_metadata(doc, pdf_path, 'pdf', page_metadata, file_size_bytes)
+            docs.append(doc)
+
+    return docs
+
+
+def _format_csv_row(row: Dict[Optional[str], Any]) -> str:
+    """One DictReader row as "column: value" lines, the way CSVLoader writes page_content."""
+    lines = []
+    for key, value in row.items():
+        if key is not None:
+            key = key.strip()
+        # Extra cells beyond the header are collected in a list under the None key
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, list):
+            value = ",".join(cell.strip() for cell in value)
+        lines.append(f"{key}: {value}")
+    return "\n".join(lines).strip()
+
+
+def _load_one_csv(csv_path_str: str, encoding: str, source_column: Optional[str], csv_args: Dict[str, Any], additional_metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[Document], int]:
+    """Returns the non-empty documents and the number of rows loaded."""
+    csv_path = Path(csv_path_str)
+    loader = CSVLoader(
+        file_path=csv_path_str,
+        encoding=encoding,
+        source_column=source_column,
+        csv_args=csv_args
+    )
+
+    documents = loader.load()
+
+    docs = []
+    for doc_idx, doc in enumerate(documents):
+        row_metadata = {'row_number': doc_idx + 1}
+        if additional_metadata:
+            row_metadata.update(additional_metadata)
+
+        doc.page_content = doc.page_content.strip()
+
+        if doc.page_content:
+            DocumentLoader._enrich_metadata(doc, csv_path, 'csv', row_metadata)
+            docs.append(doc)
+
+    return docs, len(documents)
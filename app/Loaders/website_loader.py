@@ -10,10 +10,13 @@ nest_asyncio.apply()
 
 class WebLoader:
 
-    def __init__(self):
-        self.html_transformer = Html2TextTransformer()
+    def __init__(self, sitemap_requests_per_second: int = 20, async_requests_per_second: int = 50):
+        self.html_transformer = Html2TextTransformer(ignore_links=True, ignore_images=True)
+        # LangChain defaults to 2 requests/second, far below what network-bound crawls can take
+        self.sitemap_requests_per_second = sitemap_requests_per_second
+        self.async_requests_per_second = async_requests_per_second
         self.stats = {
-            'successfull':0,
+            'sucessfull':0,
             'failure':0,
             'total':0
         }
@@ -21,12 +24,13 @@ class WebLoader:
     def _postprocess(self,docs:Sequence[Document],source_type:str)->List[Document]:
         """ Post-process documents by cleaning content and adding metadata. """
         processed_docs = []
+        ingested_at = str(datetime.datetime.now())
         for d in docs:
             try:
                 d.page_content = d.page_content.strip()
                 d.metadata.update({
                     "source_type": source_type,
-                    "ingested_at": str(datetime.datetime.now()),
+                    "ingested_at": ingested_at,
                     "content_length": len(d.page_content)
                 })
 
@@ -53,10 +57,29 @@ class WebLoader:
         return process
 
 
+    async def aload_single_page(self,url:str)->List[Document]:
+        """ Load a single Web Page without blocking the event loop """
+        try:
+            docs = [doc async for doc in WebBaseLoader(url).alazy_load()]
+            process = self._postprocess(docs, "web_page")
+            self.stats['sucessfull']+=1
+            self.stats['total']+=1
+        except Exception as e:
+            self.stats['failure']+=1
+            raise ValueError("Error loading single page")
+        
+        return process
+
+
     def load_sitemap(self, sitemap_url: str, filter_urls: Optional[List[str]] = None) -> List[Document]:
         """ Load all pages from a sitemap """
         try:
-            loader = SitemapLoader(sitemap_url, filter_urls=filter_urls)
+            loader = SitemapLoader(
+                sitemap_url,
+                filter_urls=filter_urls,
+                requests_per_second=self.sitemap_requests_per_second,
+                continue_on_failure=True
+            )
             docs = loader.load()
             processed = self._postprocess(docs, "sitemap")
             self.stats['sucessfull']+=1
@@ -85,13 +108,35 @@ class WebLoader:
         return processed
 
 
+    async def aload_recursive(self, base_url: str, max_depth: int = 2) -> List[Document]:
+        """ Recursively crawl a website, fetching each depth level's links concurrently. """
+        try:
+            # use_async makes the loader fetch all child links of a page with asyncio.gather
+            # over aiohttp instead of one requests.get after another
+            docs = await RecursiveUrlLoader(
+                url=base_url,
+                max_depth=max_depth,
+                use_async=True
+            ).aload()
+            processed = self._postprocess(docs, "recursive")
+            self.stats['sucessfull']+=1
+            self.stats['total']+=1
+        except Exception as e:
+            self.stats['failure']+=1
+            raise ValueError("Error collecting website data recusively")
+        
+        return processed
+
+
     def load_async_urls(self,urls: List[str])->List[Document]:
         """ Load multiple URLs asynchronously for faster processing. """
         try:
-            loader = AsyncHtmlLoader(urls)
-            docs = list(loader.lazy_load())
+            loader = AsyncHtmlLoader(urls, requests_per_second=self.async_requests_per_second)
+            docs = []
+            # Convert each page as it is yielded so its raw HTML can be freed right away
+            for raw_doc in loader.lazy_load():
+                docs.extend(self.html_transformer.transform_documents([raw_doc]))
 
-            docs = self.html_transformer.transform_documents(docs)
             processed = self._postprocess(docs, "async")
             self.stats['sucessfull']+=1
             self.stats['total']+=len(docs)
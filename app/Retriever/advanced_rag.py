@@ -1,42 +1,82 @@
-from typing import Dict, Any
-import time
+from typing import Dict, Any, Iterator, Optional
+
+from app.Embedding.semantic_cache import SemanticCache
 
 class AdvancedRAGPipeline:
-    def __init__(self, rag, llm):
+    def __init__(self, rag, llm, cache_threshold: float = 0.97, cache_dir: Optional[str] = "../data/query_cache"):
         self.retriever = rag
         self.llm = llm
         self.history = [] 
+        # Answers for recent questions, matched on query embedding similarity
+        self.answer_cache = SemanticCache(threshold=cache_threshold, persist_dir=cache_dir)
+
+    def _retrieve(self, question: str, top_k: int, min_score: float):
+        """
+        Returns (query_embedding, cached_answer, context, sources). cached_answer
+        is None unless a near-duplicate question was answered before; context is
+        empty when nothing relevant was found.
+        """
+        # Near-duplicate questions skip the vector store query and the LLM call.
+        # Answers computed before the last ingest or clear are dropped first.
+        self.answer_cache.sync_version(self.retriever.vector_store.version)
+        query_embedding = self.retriever.embedding_manager.generate_embedding([question])[0]
+        cached = self.answer_cache.lookup(query_embedding)
+        if cached is not None and cached['top_k'] == top_k and cached['min_score'] == min_score:
+            return query_embedding, cached['answer'], "", cached['sources']
+
+        results = self.retriever.retrieve(question, top_k=top_k, score_threshold=min_score)
+        if not results:
+            return query_embedding, None, "", []
+
+        context = "\n\n".join([doc['content'] for doc in results])
+        sources = [{
+            'source': doc['metadata'].get('source_file', doc['metadata'].get('source', 'unknown')),
+            'page': doc['metadata'].get('page', 'unknown'),
+            'score': doc['similarity_score'],
+            'preview': doc['content'][:120] + '...'
+        } for doc in results]
+        return query_embedding, None, context, sources
+
+    def _cache_answer(self, query_embedding, top_k: int, min_score: float, answer: str, sources):
+        # A failed LLM call comes back as an error string; don't serve it again
+        if not answer or self.llm.ERROR_PREFIX in answer:
+            return
+        self.answer_cache.add(query_embedding, {
+            'top_k': top_k,
+            'min_score': min_score,
+            'answer': answer,
+            'sources': sources
+        })
+
+    @staticmethod
+    def _citations(sources) -> str:
+        citations = [f"[{i+1}] {src['source']} (page {src['page']})" for i, src in enumerate(sources)]
+        return "\n\nCitations:\n" + "\n".join(citations) if citations else ""
 
     def query(self, question: str, top_k: int = 5, min_score: float = 0.2, stream: bool = False, summarize: bool = False) -> Dict[str, Any]:
     
-        results = self.retriever.retrieve(question, top_k=top_k, score_threshold=min_score)
+        query_embedding, cached_answer, context, sources = self._retrieve(question, top_k, min_score)
         
-        if not results:
+        if cached_answer is not None:
+            answer = cached_answer
+        elif not context:
             answer = "No relevant context found."
-            sources = []
-            context = ""
         else:
-            context = "\n\n".join([doc['content'] for doc in results])
-            sources = [{
-                'source': doc['metadata'].get('source_file', doc['metadata'].get('source', 'unknown')),
-                'page': doc['metadata'].get('page', 'unknown'),
-                'score': doc['similarity_score'],
-                'preview': doc['content'][:120] + '...'
-            } for doc in results]
-            # Streaming answer simulation
-            prompt = f"""Use the following context to answer the question concisely.\nContext:\n{context}\n\nQuestion: {question}\n\nAnswer:"""
             if stream:
+                # Print tokens as they arrive instead of waiting for the full answer
                 print("Streaming answer:")
-                for i in range(0, len(prompt), 80):
-                    print(prompt[i:i+80], end='', flush=True)
-                    time.sleep(0.05)
+                parts = []
+                for token in self.llm.generate_response_stream(context=context, query=question):
+                    print(token, end='', flush=True)
+                    parts.append(token)
                 print()
-            response = self.llm.generate_response(context=context, query=question)
-            answer = response
+                answer = "".join(parts)
+            else:
+                answer = self.llm.generate_response(context=context, query=question)
+            self._cache_answer(query_embedding, top_k, min_score, answer, sources)
 
         # Add citations to answer
-        citations = [f"[{i+1}] {src['source']} (page {src['page']})" for i, src in enumerate(sources)]
-        answer_with_citations = answer + "\n\nCitations:\n" + "\n".join(citations) if citations else answer
+        answer_with_citations = answer + self._citations(sources)
 
         # Optionally summarize answer
         summary = None
@@ -60,3 +100,37 @@ class AdvancedRAGPipeline:
             'summary': summary,
             'history': self.history
         }
+
+    def query_stream(self, question: str, top_k: int = 5, min_score: float = 0.2) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming form of query(): yields {'sources': [...]} first, then
+        {'delta': text} chunks of the answer (citations last) as the LLM
+        produces them.
+        """
+        query_embedding, cached_answer, context, sources = self._retrieve(question, top_k, min_score)
+        yield {'sources': sources}
+
+        if cached_answer is not None:
+            answer = cached_answer
+            yield {'delta': answer}
+        elif not context:
+            answer = "No relevant context found."
+            yield {'delta': answer}
+        else:
+            parts = []
+            for token in self.llm.generate_response_stream(context=context, query=question):
+                parts.append(token)
+                yield {'delta': token}
+            answer = "".join(parts)
+            self._cache_answer(query_embedding, top_k, min_score, answer, sources)
+
+        citations = self._citations(sources)
+        if citations:
+            yield {'delta': citations}
+
+        self.history.append({
+            'question': question,
+            'answer': answer,
+            'sources': sources,
+            'summary': None
+        })
@@ -1,13 +1,8 @@
 import os
+from typing import Iterator
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
-from langchain_core.prompts import (
-    ChatPromptTemplate,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate
-)
-
-from langchain.messages import SystemMessage
+from langchain.messages import HumanMessage, SystemMessage
 
 from app.Retriever.rag_retriever import RAGRetriever
 
@@ -16,6 +11,9 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 class LLM:
+    # Prefix of the text returned in place of an answer when the model call fails
+    ERROR_PREFIX = "Error generating response"
+
     def __init__(self,rag:RAGRetriever,model_name:str="meta-llama/llama-4-maverick-17b-128e-instruct"):
         self.model_name = model_name
         self.api_keys = GROQ_API_KEY
@@ -29,29 +27,39 @@ class LLM:
             max_tokens=2048,
         )
         
-        self.prompt = ChatPromptTemplate.from_messages([
-   
-             SystemMessage(
-                    content="You are a helpful AI assistant. Answer ONLY using the provided context."
-            ),
-            HumanMessagePromptTemplate.from_template(
-                    "Context:\n{context}\n\nQuestion:\n{question}"
-             )
-        ])
+        # Built once; the human turn is a plain f-string per request
+        self._system = SystemMessage(
+            content="You are a helpful AI assistant. Answer ONLY using the provided context."
+        )
+
+    def _build_messages(self,query:str,context:str):
+        return [
+            self._system,
+            HumanMessage(content=f"Context:\n{context}\n\nQuestion:\n{query}")
+        ]
 
     def generate_response(self,query:str,context:str,max_length:int = 500)->str:
         try:
-            messages = self.prompt.format_messages(
-                question=query,
-                context=context
-            )
+            messages = self._build_messages(query, context)
 
             response = self.llm.invoke(messages)
             print("Generating LLM Response from query and context")
             return str(response.content)
 
         except Exception as e:
-            return f"Error generating response: {e}"
+            return f"{self.ERROR_PREFIX}: {e}"
+
+    def generate_response_stream(self,query:str,context:str)->Iterator[str]:
+        """Yield the answer in chunks as the model produces them."""
+        try:
+            messages = self._build_messages(query, context)
+
+            for chunk in self.llm.stream(messages):
+                if chunk.content:
+                    yield str(chunk.content)
+
+        except Exception as e:
+            yield f"{self.ERROR_PREFIX}: {e}"
 
     def llm_rag_retrive(self,query:str,top_k=2):
         result = self.rag.retrieve(query,top_k)
@@ -1,4 +1,5 @@
 from typing import Any, Dict, List
+import numpy as np
 
 from app.Embedding.embedding import EmbeddingManager
 from app.Embedding.vector_store import VectorStore
@@ -24,22 +25,19 @@ class RAGRetriever:
             if results['documents'] and results['documents'][0]:
                 documents = results['documents'][0]
                 metadatas = results['metadatas'][0]
-                distances = results['distances'][0]
+                distances = np.asarray(results['distances'][0])
                 ids = results['ids'][0]
 
-
-                for i,(doc_id,distance,metadata,document) in enumerate(zip(ids,distances,metadatas,documents)):
-                    similarity_score = 1-distance
-                    
-                    if similarity_score >= score_threshold:
-                        retrieved_docs.append({
-                            'id': doc_id,
-                            'content': document,
-                            'metadata': metadata,
-                            'similarity_score': similarity_score,
-                            'distance': distance,
-                            'rank': i + 1
-                        })
+                similarity_scores = 1.0 - distances
+                for i in np.flatnonzero(similarity_scores >= score_threshold):
+                    retrieved_docs.append({
+                        'id': ids[i],
+                        'content': documents[i],
+                        'metadata': metadatas[i],
+                        'similarity_score': float(similarity_scores[i]),
+                        'distance': float(distances[i]),
+                        'rank': int(i) + 1
+                    })
                 
                 print(f"Retrieved {len(retrieved_docs)} documents (after filtering)")
             else:
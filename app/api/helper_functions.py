@@ -1,60 +1,166 @@
 
+import asyncio
 import shutil
-from typing import List
-from fastapi import HTTPException
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from fastapi import HTTPException, UploadFile
 from app.Embedding.chunking import Chunking
 from app.Embedding.embedding import EmbeddingManager
 from app.Embedding.vector_store import VectorStore
-from app.dependencies import get_chunk_loader, get_document_loader, get_embedding_manager, get_vector_store, get_web_loader
+from app.Loaders.website_loader import WebLoader
+from app.dependencies import manager
 from app.task_manager import TaskManager
+from werkzeug.utils import secure_filename
 
 
-def process_and_index(
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Uploads up to this size are parsed from memory instead of a temp file
+IN_MEMORY_UPLOAD_MAX_SIZE = 32 * 1024 * 1024
+
+
+def _copy_upload(file: UploadFile, path: Path):
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer, length=UPLOAD_CHUNK_SIZE)
+
+
+async def save_upload(file: UploadFile, path: Path):
+    """Write an uploaded file to disk in 1 MB chunks without blocking the event loop."""
+    await asyncio.to_thread(_copy_upload, file, path)
+
+
+async def save_pdf_uploads(files: List[UploadFile], temp_dir: str, max_concurrency: int = 8) -> List[str]:
+    """
+    Validate names up front, then save every .pdf upload into temp_dir concurrently.
+    Returns the original filenames of the saved PDFs, in upload order.
+    """
+    if any(not file.filename for file in files):
+        raise ValueError("Error in Filename")
+
+    pdfs = [file for file in files if file.filename.endswith('.pdf')]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def save_one(index: int, file: UploadFile):
+        # One subdirectory per upload: two files with the same sanitized name
+        # must not be written to one path concurrently. The file keeps its
+        # name, which becomes the chunks' source_file metadata.
+        target_dir = Path(temp_dir) / str(index)
+        target_dir.mkdir()
+        async with semaphore:
+            await save_upload(file, target_dir / (secure_filename(file.filename) or "upload.pdf"))
+
+    await asyncio.gather(*(save_one(i, file) for i, file in enumerate(pdfs)))
+    return [file.filename for file in pdfs]
+
+
+def _throttled_progress(task_manager: Optional[TaskManager], task_id: Optional[str], min_interval: float = 0.5):
+    """
+    Progress callback for tight loops: forwards to update_progress only when the
+    whole percentage changes or min_interval seconds have passed, so subscribers
+    aren't flooded. force=True always goes through (use it for the last item).
+    """
+    last_pct = -1
+    last_t = 0.0
+
+    def report(step: str, percentage: float, items_processed: int, total_items: int, force: bool = False):
+        nonlocal last_pct, last_t
+        if not (task_manager and task_id):
+            return
+        now = time.monotonic()
+        if force or int(percentage) != last_pct or now - last_t > min_interval:
+            last_pct, last_t = int(percentage), now
+            task_manager.update_progress(task_id, step, percentage, items_processed, total_items)
+
+    return report
+
+
+def _process_and_index_core(
     docs: list, 
     chunk_loader: Chunking, 
     embedding_manager: EmbeddingManager, 
     vector_store: VectorStore,
     task_manager: TaskManager = None,
-    task_id: str = None
+    task_id: str = None,
+    batch_size: int = 64,
+    insert_batch_size: int = 500
 ) -> int:
     """
     Centralized Pipeline: Chunk -> Filter -> Embed -> Store
+    Raises ValueError when there is nothing to index; background tasks call this
+    directly and report failures through the task manager.
     Returns: Number of chunks created.
     """
     if not docs:
-        raise HTTPException(status_code=400, detail="No content extracted from source.")
+        raise ValueError("No content extracted from source.")
 
     # Step 1: Chunking (20%)
     if task_manager and task_id:
         task_manager.update_progress(task_id, "Chunking documents...", 10, 0, len(docs))
     
     chunks = chunk_loader.recursive_text_splitter(docs)
-    filtered_chunks = [doc for doc in chunks if doc.page_content.strip()]
+    # Single pass: keep non-empty chunks and collect their texts together
+    filtered_chunks = []
+    texts = []
+    for doc in chunks:
+        content = doc.page_content
+        if content.strip():
+            filtered_chunks.append(doc)
+            texts.append(content)
     
     if not filtered_chunks:
-        raise HTTPException(status_code=400, detail="No valid content after chunking.")
+        raise ValueError("No valid content after chunking.")
     
     if task_manager and task_id:
         task_manager.update_progress(task_id, "Chunking complete", 30, len(filtered_chunks), len(filtered_chunks))
 
-    # Step 2: Embedding (30% - 80%)
+    # Step 2+3: Embed and store (40% - 100%), as a two-stage pipeline
     if task_manager and task_id:
         task_manager.update_progress(task_id, "Generating embeddings...", 40, 0, len(filtered_chunks))
     
-    texts = [doc.page_content for doc in filtered_chunks]
-    embeddings = embedding_manager.generate_embedding(texts)
-    
-    if embeddings is None or len(embeddings) == 0:
-        raise HTTPException(status_code=500, detail="Embeddings generation failed")
-    
-    if task_manager and task_id:
-        task_manager.update_progress(task_id, "Embeddings generated", 80, len(embeddings), len(filtered_chunks))
-    
-    # Step 3: Store (80% - 100%)
-    if task_manager and task_id:
-        task_manager.update_progress(task_id, "Storing in vector database...", 90, 0, len(filtered_chunks))
-    
-    vector_store.add_documents(filtered_chunks, embeddings)
+    n = len(texts)
+    # One contiguous matrix, filled in place and handed straight to the store
+    embeddings = np.empty((n, embedding_manager.dimension), dtype=np.float32)
+
+    report = _throttled_progress(task_manager, task_id)
+
+    def store(start: int, end: int):
+        vector_store.add_documents(filtered_chunks[start:end], embeddings[start:end], start_index=start)
+        report("Storing chunks...", 40 + 60 * end / n, end, n, force=end == n)
+
+    # The single insert worker writes slice N while this thread embeds slice N+1
+    # (model.encode releases the GIL); at most one insert is in flight at a time
+    # Repeated boilerplate (headers, footers, nav bars) is embedded once per ingest:
+    # first row seen for each text, later copies are filled from it
+    first_row = {}
+    with ThreadPoolExecutor(max_workers=1) as insert_pool:
+        pending = None
+        for start in range(0, n, insert_batch_size):
+            end = min(start + insert_batch_size, n)
+            new_rows, dup_rows, src_rows = [], [], []
+            for i in range(start, end):
+                j = first_row.setdefault(texts[i], i)
+                if j == i:
+                    new_rows.append(i)
+                else:
+                    dup_rows.append(i)
+                    src_rows.append(j)
+
+            # generate_embedding length-sorts each slice into similar-sized mini-batches
+            if new_rows:
+                embeddings[new_rows] = embedding_manager.generate_embedding([texts[i] for i in new_rows], batch_size)
+            if dup_rows:
+                embeddings[dup_rows] = embeddings[src_rows]
+
+            if pending is not None:
+                pending.result()
+            pending = insert_pool.submit(store, start, end)
+
+        pending.result()
+
+    if len(first_row) < n:
+        print(f"♻️ Reused embeddings for {n - len(first_row)} duplicate chunk(s)")
     
     if task_manager and task_id:
         task_manager.update_progress(task_id, "Complete", 100, len(filtered_chunks), len(filtered_chunks))
@@ -62,28 +168,46 @@ def process_and_index(
     return len(filtered_chunks)
 
 
+def process_and_index(
+    docs: list, 
+    chunk_loader: Chunking, 
+    embedding_manager: EmbeddingManager, 
+    vector_store: VectorStore,
+    **kwargs
+) -> int:
+    """Request-handler wrapper around _process_and_index_core: ValueError -> HTTP 400."""
+    try:
+        return _process_and_index_core(docs, chunk_loader, embedding_manager, vector_store, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # --- Background Processing Functions ---
 
 def process_pdf_background(
-    temp_dir: str,
+    temp_dir: Optional[str],
     filename: str,
     task_id: str,
-    task_manager: TaskManager
+    task_manager: TaskManager,
+    data: Optional[bytes] = None
 ):
-    """Background task for PDF processing."""
+    """Background task for PDF processing, from a temp directory or in-memory bytes."""
     try:
         task_manager.update_progress(task_id, "Loading PDF...", 5, 0, 1)
         
         # Get dependencies (lazy loaded)
-        doc_loader = get_document_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        doc_loader = manager.get_document_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
         task_manager.update_progress(task_id, "Extracting content from PDF...", 15, 0, 1)
-        docs = doc_loader.load_pdfs(pdf_dir=temp_dir)
+        if data is not None:
+            docs = doc_loader.load_pdf_bytes(data, filename)
+        else:
+            docs = doc_loader.load_pdfs(pdf_dir=temp_dir)
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
@@ -98,10 +222,11 @@ def process_pdf_background(
         task_manager.fail_task(task_id, str(e))
     finally:
         # Cleanup temp directory
-        try:
-            shutil.rmtree(temp_dir)
-        except:
-            pass
+        if temp_dir:
+            try:
+                shutil.rmtree(temp_dir)
+            except:
+                pass
 
 
 def process_pdfs_background(
@@ -114,15 +239,15 @@ def process_pdfs_background(
     try:
         task_manager.update_progress(task_id, "Loading PDFs...", 5, 0, len(filenames))
         
-        doc_loader = get_document_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        doc_loader = manager.get_document_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
         task_manager.update_progress(task_id, "Extracting content from PDFs...", 15, 0, len(filenames))
         docs = doc_loader.load_pdfs(pdf_dir=temp_dir)
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
@@ -151,15 +276,15 @@ def process_webpage_background(
     try:
         task_manager.update_progress(task_id, "Loading webpage...", 10, 0, 1)
         
-        web_loader = get_web_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        web_loader = manager.get_web_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
         task_manager.update_progress(task_id, "Extracting content...", 20, 0, 1)
         docs = web_loader.load_single_page(url)
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
@@ -174,6 +299,33 @@ def process_webpage_background(
         task_manager.fail_task(task_id, str(e))
 
 
+async def _gather_urls(
+    web_loader: WebLoader,
+    urls: List[str],
+    task_id: str,
+    task_manager: TaskManager,
+    max_concurrency: int = 8
+):
+    """Fetch pages concurrently (bounded), reporting progress as each one finishes."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def load_one(url: str):
+        async with semaphore:
+            return await web_loader.aload_single_page(url)
+
+    report = _throttled_progress(task_manager, task_id)
+    docs = []
+    failed = 0
+    for done, future in enumerate(asyncio.as_completed([load_one(url) for url in urls]), 1):
+        try:
+            docs.extend(await future)
+        except Exception:
+            failed += 1
+        report("Fetching webpages...", 10 + 10 * done / len(urls), done, len(urls), force=done == len(urls))
+
+    return docs, failed
+
+
 def process_webpages_background(
     urls: List[str],
     task_id: str,
@@ -183,22 +335,22 @@ def process_webpages_background(
     try:
         task_manager.update_progress(task_id, f"Loading {len(urls)} webpages...", 10, 0, len(urls))
         
-        web_loader = get_web_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        web_loader = manager.get_web_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
-        task_manager.update_progress(task_id, "Extracting content...", 20, 0, len(urls))
-        docs = web_loader.load_async_urls(urls)
+        docs, failed = asyncio.run(_gather_urls(web_loader, urls, task_id, task_manager))
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
         
         task_manager.complete_task(task_id, {
             "message": "Webpages ingested successfully",
-            "urls_processed": len(urls),
+            "urls_processed": len(urls) - failed,
+            "urls_failed": failed,
             "chunks_created": count
         })
         
@@ -216,15 +368,15 @@ def process_sitemap_background(
     try:
         task_manager.update_progress(task_id, "Loading sitemap...", 10, 0, 1)
         
-        web_loader = get_web_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        web_loader = manager.get_web_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
         task_manager.update_progress(task_id, "Extracting pages from sitemap...", 20, 0, 1)
         docs = web_loader.load_sitemap(sitemap_url, filter_urls=filter_urls)
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
@@ -249,15 +401,15 @@ def process_recursive_background(
     try:
         task_manager.update_progress(task_id, f"Crawling website (depth: {max_depth})...", 10, 0, 1)
         
-        web_loader = get_web_loader()
-        chunk_loader = get_chunk_loader()
-        embed_manager = get_embedding_manager()
-        vector_store = get_vector_store()
+        web_loader = manager.get_web_loader()
+        chunk_loader = manager.get_chunk_loader()
+        embed_manager = manager.get_embedding_manager()
+        vector_store = manager.get_vector_store()
         
         task_manager.update_progress(task_id, "Extracting content from pages...", 20, 0, 1)
-        docs = web_loader.load_recursive(base_url, max_depth=max_depth)
+        docs = asyncio.run(web_loader.aload_recursive(base_url, max_depth=max_depth))
         
-        count = process_and_index(
+        count = _process_and_index_core(
             docs, chunk_loader, embed_manager, vector_store,
             task_manager, task_id
         )
@@ -1,12 +1,13 @@
 from typing import Annotated, Any, Dict, List
 import asyncio
+import orjson
 import uuid
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, BackgroundTasks
+import zlib
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, BackgroundTasks, Header
 from fastapi.responses import StreamingResponse
-import shutil
+from starlette.concurrency import iterate_in_threadpool
 import tempfile
 from pathlib import Path
-import json
 
 from app.Retriever.advanced_rag import AdvancedRAGPipeline
 from app.Retriever.llm import LLM
@@ -16,11 +17,11 @@ from app.Loaders.website_loader import WebLoader
 from app.Embedding.chunking import Chunking
 from app.Embedding.embedding import EmbeddingManager
 from app.Embedding.vector_store import VectorStore
-from app.api.helper_functions import process_and_index, process_pdf_background, process_pdfs_background, process_recursive_background, process_sitemap_background, process_webpage_background, process_webpages_background
+from app.api.helper_functions import IN_MEMORY_UPLOAD_MAX_SIZE, process_and_index, save_pdf_uploads, save_upload, process_pdf_background, process_pdfs_background, process_recursive_background, process_sitemap_background, process_webpage_background, process_webpages_background
 from app.dependencies import (
     get_llm, get_rag, get_document_loader, get_chunk_loader, 
     get_embedding_manager, get_vector_store, get_web_loader, get_adv_rag,
-    get_task_manager
+    get_task_manager, get_initialization_status
 )
 from app.models import MultiUrlRequest,QueryRequest,RecursiveUrlRequest, TaskStatus,UrlRequest,SitemapRequest
 from app.task_manager import TaskManager
@@ -48,14 +49,48 @@ TaskManagerDep = Annotated[TaskManager, Depends(get_task_manager)]
 @router.get("/tasks/{task_id}")
 def get_task_status(task_id: str, task_manager: TaskManagerDep):
     """Get the status of a background task."""
-    task = task_manager.get_task(task_id)
+    task = task_manager.get_task_dict(task_id)
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    return task.to_dict()
+    return task
+
+
+async def _gzip_events(events):
+    """
+    Gzip an SSE stream as one continuous member, sync-flushing after every
+    event so nothing is held back in the compressor. Progress snapshots
+    repeat the same keys, so later events shrink to a few bytes.
+    """
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    try:
+        async for chunk in events:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        await events.aclose()
+
+
+def _event_stream_response(events, accept_encoding: str) -> StreamingResponse:
+    """
+    SSE response for an async iterator of event bytes. Compressed here, per
+    event, when the client accepts gzip; GZipMiddleware would otherwise
+    buffer the stream.
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        events = _gzip_events(events)
+    
+    return StreamingResponse(events, media_type="text/event-stream", headers=headers)
 
 
 @router.get("/tasks/{task_id}/stream")
-async def stream_task_progress(task_id: str, task_manager: TaskManagerDep):
+async def stream_task_progress(task_id: str, task_manager: TaskManagerDep, accept_encoding: Annotated[str, Header()] = ""):
     """
     Server-Sent Events endpoint for real-time task progress updates.
     
@@ -71,47 +106,35 @@ async def stream_task_progress(task_id: str, task_manager: TaskManagerDep):
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
     
     async def event_generator():
-        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
-        task_manager.subscribe(task_id, queue)
+        task_manager.subscribe(task_id)
+        seen = 0
         
         try:
-            # Send initial state
-            current_task = task_manager.get_task(task_id)
-            if current_task:
-                yield f"data: {json.dumps(current_task.to_dict())}\n\n"
-            
-            # Stream updates until task completes
+            # Stream the latest state whenever it changes, until the task completes
             while True:
-                try:
-                    update = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(update)}\n\n"
+                version, snapshot, payload = task_manager.get_state(task_id)
+                if snapshot is None:
+                    # Task was cleaned up
+                    break
+                
+                if version > seen:
+                    seen = version
+                    yield b"data: " + payload + b"\n\n"
                     
                     # Stop if task is done
-                    if update.get("status") in [TaskStatus.COMPLETED.value, TaskStatus.FAILED.value]:
+                    if snapshot["status"] in [TaskStatus.COMPLETED.value, TaskStatus.FAILED.value]:
                         break
-                        
+                
+                try:
+                    await asyncio.wait_for(task_manager.wait_for_update(task_id, seen), timeout=30.0)
                 except asyncio.TimeoutError:
                     # Send heartbeat to keep connection alive
-                    yield f": heartbeat\n\n"
-                    
-                    # Check if task is done
-                    current = task_manager.get_task(task_id)
-                    if current and current.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                        yield f"data: {json.dumps(current.to_dict())}\n\n"
-                        break
+                    yield b": heartbeat\n\n"
                         
         finally:
-            task_manager.unsubscribe(task_id, queue)
-    
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
-    )
+            task_manager.unsubscribe(task_id)
+    
+    return _event_stream_response(event_generator(), accept_encoding)
 
 
 @router.get("/tasks")
@@ -120,10 +143,10 @@ def get_all_tasks(task_manager: TaskManagerDep):
     return task_manager.get_all_tasks()
 
 
-# @router.get("/components/status")
-# def get_components_status():
-#     """Get initialization status of heavy components."""
-#     return get_initialization_status()
+@router.get("/components/status")
+def get_components_status():
+    """Get initialization status of heavy components."""
+    return get_initialization_status()
 
 
 # --- Query Endpoints (Synchronous - no change needed) ---
@@ -141,6 +164,20 @@ def query_advanced_rag(query:str, adv_rag: AdvRagDep):
     results = adv_rag.query(query)
     return {"response": results}
 
+@router.get("/advanced_query/stream")
+def stream_advanced_rag(query: str, adv_rag: AdvRagDep, accept_encoding: Annotated[str, Header()] = ""):
+    """
+    Server-Sent Events version of /advanced_query: one {"sources": [...]}
+    frame, then {"delta": "..."} frames as the LLM produces the answer.
+    """
+    def event_generator():
+        for event in adv_rag.query_stream(query):
+            yield b"data: " + orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+    
+    # Iterated in the threadpool, so the blocking retrieval and LLM stream
+    # stay off the event loop
+    return _event_stream_response(iterate_in_threadpool(event_generator()), accept_encoding)
+
 
 # --- Async Upload Endpoints (Background Processing) ---
 
@@ -166,12 +203,17 @@ async def upload_pdf_async(
     # Create task
     task = task_manager.create_task("pdf_upload")
     
-    # Save file to temp directory (will be cleaned up by background task)
-    temp_dir = tempfile.mkdtemp()
-    safe_filename = f"{uuid.uuid4()}.pdf" 
-    temp_path = Path(temp_dir) / safe_filename
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    temp_dir = None
+    data = None
+    if file.size is not None and file.size <= IN_MEMORY_UPLOAD_MAX_SIZE:
+        # Small PDFs are parsed straight from memory, no disk round-trip
+        data = await file.read()
+    else:
+        # Save file to temp directory (will be cleaned up by background task)
+        temp_dir = tempfile.mkdtemp()
+        safe_filename = f"{uuid.uuid4()}.pdf" 
+        temp_path = Path(temp_dir) / safe_filename
+        await save_upload(file, temp_path)
     
     # Schedule background processing
     background_tasks.add_task(
@@ -179,7 +221,8 @@ async def upload_pdf_async(
         temp_dir,
         file.filename,
         task.id,
-        task_manager
+        task_manager,
+        data
     )
     
     return {
@@ -205,19 +248,7 @@ async def upload_multiple_pdfs_async(
     
     # Save files to temp directory
     temp_dir = tempfile.mkdtemp()
-    filenames = []
-    
-    for file in files:
-        if not file.filename:
-            raise ValueError("Error in Filename")
-        
-        if file.filename.endswith('.pdf'):
-            safe_filename = secure_filename(file.filename) 
-            
-            temp_path = Path(temp_dir) / safe_filename
-            with open(temp_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            filenames.append(file.filename)
+    filenames = await save_pdf_uploads(files, temp_dir)
     
     if not filenames:
         raise HTTPException(status_code=400, detail="No valid PDF files found.")
@@ -364,8 +395,7 @@ async def upload_pdf(
         temp = Path(temp_dir)
         safe_filename = secure_filename(file.filename) 
         temp_path = temp / safe_filename
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await save_upload(file, temp_path)
         
         try:
             docs = doc_loader.load_pdfs(pdf_dir=temp_dir)
@@ -389,24 +419,9 @@ async def upload_multiple_pdfs(
     files: List[UploadFile] = File(...)
 ):
     total_chunks = 0
-    processed_files = []
     
     with tempfile.TemporaryDirectory() as temp_dir:
-        for file in files:
-            if not file:
-                raise ValueError("No files found")
-    
-            if not file.filename:
-                raise ValueError("No file found with this name")
-            
-            if file.filename.endswith('.pdf'):
-                temp = Path(temp_dir)
-                safe_filename = secure_filename(file.filename) 
-                temp_path = temp / safe_filename
-
-                with open(temp_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-                processed_files.append(file.filename)
+        processed_files = await save_pdf_uploads(files, temp_dir)
         
         if not processed_files:
              raise HTTPException(status_code=400, detail="No valid PDF files found.")
@@ -442,24 +457,18 @@ async def upload_csv(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp = Path(temp_dir)
-        safe_filename = secure_filename(file.filename) 
-        temp_path = temp / safe_filename
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+    try:
+        # Parsed straight from the upload's spooled file, no temp directory round-trip
+        docs = doc_loader.load_csv_stream(file.file, secure_filename(file.filename), delimiter=delimiter)
+        count = process_and_index(docs, chunk_loader, embed_manager, vector_store)
         
-        try:
-            docs = doc_loader.load_csvs(csv_dir=temp_dir, delimiter=delimiter)
-            count = process_and_index(docs, chunk_loader, embed_manager, vector_store)
-            
-            return {
-                "message": "CSV uploaded and ingested successfully",
-                "filename": file.filename,
-                "chunks_created": count
-            }
-        except Exception as e:
-             raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
+        return {
+            "message": "CSV uploaded and ingested successfully",
+            "filename": file.filename,
+            "chunks_created": count
+        }
+    except Exception as e:
+         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
 
 @router.post("/ingest/webpage")
 async def ingest_webpage(
@@ -550,14 +559,39 @@ def get_stats(vector_store: StoreDep, doc_loader: DocLoaderDep):
         "document_loader_stats": doc_loader.get_stats()
     }
 
+@router.get("/stats/stream")
+async def stream_stats(vector_store: StoreDep, doc_loader: DocLoaderDep, accept_encoding: Annotated[str, Header()] = ""):
+    """
+    Server-Sent Events feed of /stats plus component status. Checked every
+    2 s and sent only when something changed, so clients can stop polling.
+    """
+    async def event_generator():
+        last = None
+        idle = 0
+        while True:
+            count = await asyncio.to_thread(vector_store.collection.count)
+            payload = orjson.dumps({
+                "vector_store_count": max(0, count),
+                "document_loader_stats": doc_loader.get_stats(),
+                "components": get_initialization_status()
+            })
+            if payload != last:
+                last = payload
+                idle = 0
+                yield b"data: " + payload + b"\n\n"
+            else:
+                idle += 1
+                if idle % 15 == 0:
+                    # Send heartbeat to keep connection alive
+                    yield b": heartbeat\n\n"
+            await asyncio.sleep(2)
+    
+    return _event_stream_response(event_generator(), accept_encoding)
+
 @router.delete("/clear")
 def clear_vector_store(vector_store: StoreDep):
     try:
-        count = max(0,vector_store.collection.count())
-        if count > 0:
-            all_data = vector_store.collection.get()
-            if all_data['ids']:
-                vector_store.collection.delete(ids=all_data['ids'])
+        count = vector_store.clear()
         return {"message": "Vector store cleared successfully", "documents_deleted": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing vector store: {str(e)}")
\ No newline at end of file
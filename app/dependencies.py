@@ -1,4 +1,6 @@
+import asyncio
 import threading
+from enum import IntEnum
 import logging
 from typing import Optional, Dict, Any
 
@@ -10,18 +12,23 @@ from app.Loaders.website_loader import WebLoader
 from app.Retriever.advanced_rag import AdvancedRAGPipeline
 from app.Retriever.llm import LLM
 from app.Retriever.rag_retriever import RAGRetriever
-from app.task_manager import TaskManager
+from app.task_manager import TaskManager, task_manager
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class ComponentId(IntEnum):
+    VECTOR_STORE = 0
+    EMBEDDING_MANAGER = 1
+    LLM = 2
+    RAG = 3
+
+
 class ComponentManager:
     """
-    Singleton manager to handle lazy loading and dependency injection 
-    of all application components.
+    Handles lazy loading and dependency injection of all application components.
+    Use the module-level `manager`; the import system guarantees it is built once.
     """
-    _instance = None
-    _lock = threading.Lock()
 
     def __init__(self):
         # Raw Components
@@ -30,61 +37,75 @@ class ComponentManager:
         self._web_loader: Optional[WebLoader] = None
         self._chunk_loader: Optional[Chunking] = None
         self._embedding_manager: Optional[EmbeddingManager] = None
-        self._task_manager: Optional[TaskManager] = None
         
         # Complex Components (depend on others)
         self._rag_retriever: Optional[RAGRetriever] = None
         self._llm: Optional[LLM] = None
         self._advanced_rag: Optional[AdvancedRAGPipeline] = None
 
-        # Status tracking
-        self.status: Dict[str, Any] = {
-            "vector_store": "pending",
-            "embedding_manager": "pending",
-            "llm": "pending",
-            "rag": "pending"
+        # One lock per component, so independent cold starts (e.g. the embedding
+        # model and the vector store) can initialize in parallel. Built
+        # components are read without locking.
+        self._init_locks: Dict[str, threading.Lock] = {
+            name: threading.Lock()
+            for name in (
+                "_vector_store", "_document_loader", "_web_loader", "_chunk_loader",
+                "_embedding_manager", "_rag_retriever", "_llm", "_advanced_rag"
+            )
+        }
+
+        # Status tracking: one ready byte per component, error text only on failure
+        self._ready = bytearray(len(ComponentId))
+        self._errors: Dict[ComponentId, str] = {}
+
+    def _mark_ready(self, component: ComponentId):
+        self._ready[component] = 1
+        self._errors.pop(component, None)
+
+    def _mark_failed(self, component: ComponentId, error: Exception):
+        self._errors[component] = str(error)
+
+    @property
+    def status(self) -> Dict[str, str]:
+        """Per-component 'pending' / 'ready' / 'error: ...' strings."""
+        return {
+            c.name.lower(): "ready" if self._ready[c] else (f"error: {self._errors[c]}" if c in self._errors else "pending")
+            for c in ComponentId
         }
 
-    @classmethod
-    def get_instance(cls):
-        """Standard Singleton Pattern"""
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = cls()
-        return cls._instance
+    def get_initialization_status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            c.name.lower(): {"initialized": bool(self._ready[c]), "error": self._errors.get(c)}
+            for c in ComponentId
+        }
 
     def get_task_manager(self) -> TaskManager:
-        if self._task_manager is None:
-            with self._lock:
-                if self._task_manager is None:
-                    self._task_manager = TaskManager()
-        return self._task_manager
+        return task_manager
 
     def get_vector_store(self) -> VectorStore:
         if self._vector_store is None:
-            with self._lock:
+            with self._init_locks["_vector_store"]:
                 if self._vector_store is None:
                     try:
                         logger.info("Initializing VectorStore...")
                         self._vector_store = VectorStore()
-                        self.status["vector_store"] = "ready"
+                        self._mark_ready(ComponentId.VECTOR_STORE)
                     except Exception as e:
-                        self.status["vector_store"] = f"error: {str(e)}"
+                        self._mark_failed(ComponentId.VECTOR_STORE, e)
                         logger.error(f"Failed to load VectorStore: {e}")
                         raise
         return self._vector_store
 
     def get_embedding_manager(self) -> EmbeddingManager:
         if self._embedding_manager is None:
-            with self._lock:
+            with self._init_locks["_embedding_manager"]:
                 if self._embedding_manager is None:
                     try:
                         logger.info("Initializing EmbeddingManager (Heavy Load)...")
                         self._embedding_manager = EmbeddingManager()
-                        self.status["embedding_manager"] = "ready"
+                        self._mark_ready(ComponentId.EMBEDDING_MANAGER)
                     except Exception as e:
-                        self.status["embedding_manager"] = f"error: {str(e)}"
+                        self._mark_failed(ComponentId.EMBEDDING_MANAGER, e)
                         raise
         return self._embedding_manager
 
@@ -94,11 +115,11 @@ class ComponentManager:
             vs = self.get_vector_store()
             em = self.get_embedding_manager()
             
-            with self._lock:
+            with self._init_locks["_rag_retriever"]:
                 if self._rag_retriever is None:
                     logger.info("Initializing RAGRetriever...")
                     self._rag_retriever = RAGRetriever(vs, em)
-                    self.status["rag"] = "ready"
+                    self._mark_ready(ComponentId.RAG)
         return self._rag_retriever
 
     def get_llm(self) -> LLM:
@@ -106,16 +127,16 @@ class ComponentManager:
             # Ensure RAG is ready before creating LLM
             rag = self.get_rag()
             
-            with self._lock:
+            with self._init_locks["_llm"]:
                 if self._llm is None:
                     try:
                         logger.info("Initializing LLM (Heavy Load)...")
                         # 
                         self._llm = LLM(rag) 
-                        self.status["llm"] = "ready"
+                        self._mark_ready(ComponentId.LLM)
                         logger.info("LLM Successfully Initialized")
                     except Exception as e:
-                        self.status["llm"] = f"error: {str(e)}"
+                        self._mark_failed(ComponentId.LLM, e)
                         logger.error(f"Failed to initialize LLM: {e}")
                         raise
         return self._llm
@@ -125,47 +146,75 @@ class ComponentManager:
             rag = self.get_rag()
             llm = self.get_llm()
             
-            with self._lock:
+            with self._init_locks["_advanced_rag"]:
                 if self._advanced_rag is None:
                     logger.info("Initializing AdvancedRAGPipeline...")
                     self._advanced_rag = AdvancedRAGPipeline(rag, llm)
         return self._advanced_rag
 
-    # Lightweight Loaders
+    # Lightweight Loaders (locked too, so concurrent background tasks share one instance)
     def get_document_loader(self) -> DocumentLoader:
         if self._document_loader is None:
-            self._document_loader = DocumentLoader()
+            with self._init_locks["_document_loader"]:
+                if self._document_loader is None:
+                    self._document_loader = DocumentLoader()
         return self._document_loader
 
     def get_web_loader(self) -> WebLoader:
         if self._web_loader is None:
-            self._web_loader = WebLoader()
+            with self._init_locks["_web_loader"]:
+                if self._web_loader is None:
+                    self._web_loader = WebLoader()
         return self._web_loader
 
     def get_chunk_loader(self) -> Chunking:
         if self._chunk_loader is None:
-            self._chunk_loader = Chunking()
+            with self._init_locks["_chunk_loader"]:
+                if self._chunk_loader is None:
+                    self._chunk_loader = Chunking()
         return self._chunk_loader
 
 # --- Public Accessors for FastAPI Dependencies ---
 
 # Create the global instance
-manager = ComponentManager.get_instance()
-
-def get_vector_store(): return manager.get_vector_store()
-def get_embedding_manager(): return manager.get_embedding_manager()
-def get_rag(): return manager.get_rag()
-def get_llm(): return manager.get_llm()
-def get_adv_rag(): return manager.get_adv_rag()
-def get_task_manager(): return manager.get_task_manager()
+manager = ComponentManager()
+
+# Async so FastAPI resolves them on the event loop instead of hopping to the
+# threadpool per request. Once built, a component is returned directly; a
+# cold start builds it in a worker thread so the loop isn't blocked meanwhile.
+# Sync code (background tasks) should call manager.get_* instead.
+async def _resolve(attr: str, getter):
+    component = getattr(manager, attr)
+    if component is not None:
+        return component
+    return await asyncio.to_thread(getter)
+
+async def get_vector_store(): return await _resolve("_vector_store", manager.get_vector_store)
+async def get_embedding_manager(): return await _resolve("_embedding_manager", manager.get_embedding_manager)
+async def get_rag(): return await _resolve("_rag_retriever", manager.get_rag)
+async def get_llm(): return await _resolve("_llm", manager.get_llm)
+async def get_adv_rag(): return await _resolve("_advanced_rag", manager.get_adv_rag)
+async def get_task_manager(): return manager.get_task_manager()
 def get_status(): return manager.status
-def get_document_loader(): return manager.get_document_loader()
-def get_chunk_loader():return manager.get_chunk_loader()
-def get_web_loader():return manager.get_web_loader()
-#def get_initialization_status():return manager.get_initialization_status()
+async def get_document_loader(): return manager.get_document_loader()
+async def get_chunk_loader(): return manager.get_chunk_loader()
+async def get_web_loader(): return manager.get_web_loader()
+def get_initialization_status(): return manager.get_initialization_status()
 # --- Startup Helper ---
-def preload_components():
+async def preload_components():
     """Call this on app startup to warm up caches"""
     logger.info("--- Starting Component Preload ---")
-    manager.get_adv_rag() # This chain loads everything: LLM -> RAG -> VectorStore/Embeddings
-    logger.info("--- Component Preload Complete ---")
\ No newline at end of file
+    # VectorStore and EmbeddingManager are independent (and have separate init
+    # locks), so open the store while the model loads
+    await asyncio.gather(
+        asyncio.to_thread(manager.get_vector_store),
+        asyncio.to_thread(manager.get_embedding_manager)
+    )
+    await asyncio.to_thread(manager.get_adv_rag) # RAG -> LLM -> AdvancedRAG on top of the two above
+    logger.info("--- Component Preload Complete ---")
+
+# --- Shutdown Helper ---
+def shutdown_components():
+    """Call this on app shutdown to flush state that is only written periodically"""
+    if manager._advanced_rag is not None:
+        manager._advanced_rag.answer_cache.close()
@@ -1,9 +1,13 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.api.routes import router
+from app.Loaders.document_loader import shutdown_pool
 import os
 from dotenv import load_dotenv
 
@@ -15,27 +19,31 @@ DATA_DIR = BASE_DIR / "data"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    import threading
-    
-    def background_preload():
-        """Preload heavy components in background thread."""
+    async def background_preload():
+        """Preload heavy components without blocking startup."""
         try:
             print("Background preloading heavy components...")
             from app.dependencies import preload_components
-            preload_components()
+            await preload_components()
             print("All components preloaded successfully!")
         except Exception as e:
             print(f"Preloading warning: {e}")
     
-    # Start preloading in background thread (non-blocking)
-    preload_thread = threading.Thread(target=background_preload, daemon=True)
-    preload_thread.start()
+    # Runs on the event loop; the blocking constructors go to worker threads
+    preload_task = asyncio.create_task(background_preload())
     
     print("App startup: Multi-Source RAG API is ready")
     print( "API docs available at: http://127.0.0.1:8000/docs")
     
     yield
 
+    preload_task.cancel()
+    await asyncio.gather(preload_task, return_exceptions=True)
+    
+    from app.dependencies import shutdown_components
+    # Both block (running parses, cache file writes), so keep them off the event loop
+    await asyncio.to_thread(shutdown_components)
+    await asyncio.to_thread(shutdown_pool)
     print(" App shutdown complete")
 
 
@@ -44,6 +52,7 @@ app = FastAPI(
     description="A multi-source RAG pipeline API supporting PDF, CSV, and web content ingestion",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware for frontend integration
@@ -55,6 +64,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresses the JSON responses (query results, stats, task lists). SSE
+# streams gzip themselves per event, which this middleware passes through.
+app.add_middleware(GZipMiddleware, minimum_size=256)
+
 
 @app.get("/")
 def read_root():
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
@@ -30,23 +31,26 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
-@dataclass
+
+@dataclass(slots=True)
 class TaskProgress:
     """Represents the progress of a task."""
     current_step: str = ""
-    percentage: float = 0.0
+    # Percentage in hundredths (0-10000), so it is stored already rounded to 2 places
+    percentage_hundredths: int = 0
     items_processed: int = 0
     total_items: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "current_step": self.current_step,
-            "percentage": round(self.percentage, 2),
+            "percentage": self.percentage_hundredths / 100,
             "items_processed": self.items_processed,
             "total_items": self.total_items
         }
 
-@dataclass
+
+@dataclass(slots=True)
 class Task:
     """Represents a background task."""
     id: str
@@ -55,17 +59,48 @@ class Task:
     progress: TaskProgress = field(default_factory=TaskProgress)
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
+    # Epoch seconds; converted to ISO strings only when they change
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # ISO strings formatted once per state change instead of on every to_dict()
+    _created_iso: str = field(default="", init=False, repr=False)
+    _updated_iso: str = field(default="", init=False, repr=False)
+    # Memoized to_dict() result; cleared by invalidate() whenever a field changes
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    # Percentage (in hundredths) subscribers were last notified of; progress
+    # updates are coalesced against this, not against the latest stored value
+    _published_hundredths: int = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self):
+        self._created_iso = datetime.fromtimestamp(self.created_at).isoformat()
+        self._updated_iso = datetime.fromtimestamp(self.updated_at).isoformat()
+    
+    def touch(self):
+        """Record a state change now."""
+        self.updated_at = time.time()
+        self._updated_iso = datetime.fromtimestamp(self.updated_at).isoformat()
+        self._cached_dict = None
+    
+    def invalidate(self):
+        """Drop the memoized to_dict() after mutating the task or its progress."""
+        self._cached_dict = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        """
+        Serialized view, built once per state change. The returned dict is shared
+        (SSE snapshots, status polls), so callers must not mutate it.
+        """
+        if self._cached_dict is not None:
+            return self._cached_dict
+        self._cached_dict = {
             "id": self.id,
             "task_type": self.task_type,
-            "status": self.status.value,
+            # TaskStatus is a str subclass, so the member itself is the string value
+            "status": self.status,
             "progress": self.progress.to_dict(),
             "result": self.result,
             "error": self.error,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
+            "created_at": self._created_iso,
+            "updated_at": self._updated_iso
         }
+        return self._cached_dict
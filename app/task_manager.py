@@ -1,88 +1,63 @@
 import asyncio
-from datetime import datetime
-from enum import Enum
-from typing import Any, Dict, Optional
-from dataclasses import dataclass, field
-import uuid
+import orjson
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+import secrets
 
+from app.models import Task, TaskStatus
 
-class TaskStatus(str, Enum):
-    PENDING = "pending"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
 
-
-@dataclass
-class TaskProgress:
-    """Represents the progress of a task."""
-    current_step: str = ""
-    percentage: float = 0.0
-    items_processed: int = 0
-    total_items: int = 0
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "current_step": self.current_step,
-            "percentage": round(self.percentage, 2),
-            "items_processed": self.items_processed,
-            "total_items": self.total_items
-        }
-
-
-@dataclass
-class Task:
-    """Represents a background task."""
-    id: str
-    task_type: str
-    status: TaskStatus = TaskStatus.PENDING
-    progress: TaskProgress = field(default_factory=TaskProgress)
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "task_type": self.task_type,
-            "status": self.status.value,
-            "progress": self.progress.to_dict(),
-            "result": self.result,
-            "error": self.error,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-        }
+_NO_STATE: Tuple[int, None, bytes] = (0, None, b"")
 
 
 class TaskManager:
     """
     Manages background tasks with progress tracking.
     
-    Thread-safe singleton that stores task state in memory.
+    Thread-safe; stores task state in memory. Use the module-level
+    `task_manager` instance (built once at import) rather than constructing one.
     For production, consider using Redis or a database.
     """
     
-    _instance: Optional["TaskManager"] = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._tasks: Dict[str, Task] = {}
-            cls._instance._subscribers: Dict[str, list] = {}
-        return cls._instance
+    def __init__(self):
+        self._tasks: Dict[str, Task] = {}
+        # Latest (version, snapshot, snapshot as JSON bytes) per task; subscribers
+        # read this on wakeup, so the JSON is encoded once however many are watching
+        self._state: Dict[str, Tuple[int, Dict[str, Any], bytes]] = {}
+        # One (loop, Condition) per watched task, shared by all its subscribers
+        self._conditions: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Condition]] = {}
+        self._subscribers: Dict[str, int] = {}
+        # Tasks with a wakeup already scheduled on the event loop
+        self._wake_pending: Set[str] = set()
+        self._lock = threading.Lock()
     
     def create_task(self, task_type: str) -> Task:
         """Create a new task and return it."""
-        task_id = str(uuid.uuid4())[:8]
+        task_id = secrets.token_hex(4)
+        while task_id in self._tasks:
+            task_id = secrets.token_hex(4)
         task = Task(id=task_id, task_type=task_type)
         self._tasks[task_id] = task
+        with self._lock:
+            self._publish(task_id, 1, task)
         return task
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get a task by ID."""
         return self._tasks.get(task_id)
     
+    def get_task_dict(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Serialized task, or None. Built under the lock that guards mutations, so
+        a half-updated dict can't be memoized after a worker thread changed it.
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        with self._lock:
+            return task.to_dict()
+    
     def update_progress(
         self, 
         task_id: str, 
@@ -91,78 +66,145 @@ class TaskManager:
         items_processed: int = 0,
         total_items: int = 0
     ):
-        """Update task progress."""
+        """
+        Update task progress. Subscribers are only notified when the step text
+        changes or the percentage has moved by at least 0.5 since they were last
+        notified. Keep counters in items_processed/total_items, not in step.
+        """
         task = self._tasks.get(task_id)
         if task:
-            task.progress.current_step = step
-            task.progress.percentage = min(percentage, 100.0)
-            task.progress.items_processed = items_processed
-            task.progress.total_items = total_items
-            task.status = TaskStatus.PROCESSING
-            task.updated_at = datetime.now()
+            hundredths = min(10000, max(0, int(percentage * 100)))
+            with self._lock:
+                progress = task.progress
+                changed = (
+                    task.status != TaskStatus.PROCESSING
+                    or step != progress.current_step
+                    or abs(hundredths - task._published_hundredths) >= 50
+                )
+                
+                progress.current_step = step
+                progress.percentage_hundredths = hundredths
+                progress.items_processed = items_processed
+                progress.total_items = total_items
+                task.invalidate()
+                
+                if changed:
+                    task.status = TaskStatus.PROCESSING
+                    task._published_hundredths = hundredths
+                    task.touch()
             
-            # Notify subscribers
-            self._notify_subscribers(task_id, task)
+            if changed:
+                # Notify subscribers
+                self._notify_subscribers(task_id, task)
     
     def complete_task(self, task_id: str, result: Dict[str, Any]):
         """Mark task as completed with result."""
         task = self._tasks.get(task_id)
         if task:
-            task.status = TaskStatus.COMPLETED
-            task.progress.percentage = 100.0
-            task.result = result
-            task.updated_at = datetime.now()
+            with self._lock:
+                task.status = TaskStatus.COMPLETED
+                task.progress.percentage_hundredths = 10000
+                task.result = result
+                task.touch()
             self._notify_subscribers(task_id, task)
     
     def fail_task(self, task_id: str, error: str):
         """Mark task as failed with error message."""
         task = self._tasks.get(task_id)
         if task:
-            task.status = TaskStatus.FAILED
-            task.error = error
-            task.updated_at = datetime.now()
+            with self._lock:
+                task.status = TaskStatus.FAILED
+                task.error = error
+                task.touch()
             self._notify_subscribers(task_id, task)
     
-    def subscribe(self, task_id: str, queue: asyncio.Queue):
-        """Subscribe to task updates."""
-        if task_id not in self._subscribers:
-            self._subscribers[task_id] = []
-        self._subscribers[task_id].append(queue)
+    def subscribe(self, task_id: str):
+        """Register an update listener for a task. Call from the event loop."""
+        if task_id not in self._conditions:
+            self._conditions[task_id] = (asyncio.get_running_loop(), asyncio.Condition())
+        self._subscribers[task_id] = self._subscribers.get(task_id, 0) + 1
+    
+    def unsubscribe(self, task_id: str):
+        """Drop a listener; the task's condition goes with the last one."""
+        count = self._subscribers.get(task_id, 0) - 1
+        if count > 0:
+            self._subscribers[task_id] = count
+        else:
+            self._subscribers.pop(task_id, None)
+            self._conditions.pop(task_id, None)
+            self._wake_pending.discard(task_id)
+    
+    def get_state(self, task_id: str) -> Tuple[int, Optional[Dict[str, Any]], bytes]:
+        """Latest (version, task dict, task JSON) for a task, or (0, None, b"") if it doesn't exist."""
+        return self._state.get(task_id, _NO_STATE)
     
-    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
-        """Unsubscribe from task updates."""
-        if task_id in self._subscribers:
-            try:
-                self._subscribers[task_id].remove(queue)
-            except ValueError:
-                pass
+    def _publish(self, task_id: str, version: int, task: Task):
+        # Caller holds self._lock
+        snapshot = task.to_dict()
+        self._state[task_id] = (version, snapshot, orjson.dumps(snapshot))
+    
+    async def wait_for_update(self, task_id: str, seen_version: int):
+        """Wait until the task's state is newer than seen_version."""
+        entry = self._conditions.get(task_id)
+        if entry is None:
+            return
+        _, condition = entry
+        async with condition:
+            await condition.wait_for(lambda: self.get_state(task_id)[0] > seen_version)
+    
+    async def _notify_all(self, task_id: str, condition: asyncio.Condition):
+        with self._lock:
+            self._wake_pending.discard(task_id)
+        async with condition:
+            condition.notify_all()
     
     def _notify_subscribers(self, task_id: str, task: Task):
-        """Notify all subscribers of task updates."""
-        if task_id in self._subscribers:
-            for queue in self._subscribers[task_id]:
-                try:
-                    queue.put_nowait(task.to_dict())
-                except asyncio.QueueFull:
-                    pass
+        """
+        Publish the new state and wake all subscribers at once.
+        Constant work per update however many clients are watching, and safe
+        to call from worker threads.
+        """
+        entry = self._conditions.get(task_id)
+        with self._lock:
+            self._publish(task_id, self._state.get(task_id, _NO_STATE)[0] + 1, task)
+            # Subscribers read the latest state on wakeup, so updates that land
+            # before a scheduled wakeup has run can share it
+            if entry is None or task_id in self._wake_pending:
+                return
+            self._wake_pending.add(task_id)
+        
+        loop, condition = entry
+        try:
+            asyncio.run_coroutine_threadsafe(self._notify_all(task_id, condition), loop)
+        except RuntimeError:
+            # Event loop already closed (shutdown)
+            with self._lock:
+                self._wake_pending.discard(task_id)
     
     def get_all_tasks(self) -> Dict[str, Dict]:
         """Get all tasks (for debugging/admin)."""
-        return {tid: t.to_dict() for tid, t in self._tasks.items()}
+        with self._lock:
+            return {tid: t.to_dict() for tid, t in list(self._tasks.items())}
     
     def cleanup_old_tasks(self, max_age_hours: int = 24):
-        """Remove tasks older than max_age_hours."""
-        now = datetime.now()
+        """
+        Remove tasks older than max_age_hours.
+        _tasks is in creation order (dicts keep insertion order), so the scan
+        stops at the first task that is still young enough.
+        """
+        cutoff = time.time() - max_age_hours * 3600
         to_remove = []
         for task_id, task in self._tasks.items():
-            age = (now - task.created_at).total_seconds() / 3600
-            if age > max_age_hours:
-                to_remove.append(task_id)
+            if task.created_at >= cutoff:
+                break
+            to_remove.append(task_id)
         
         for task_id in to_remove:
             del self._tasks[task_id]
-            if task_id in self._subscribers:
-                del self._subscribers[task_id]
+            self._state.pop(task_id, None)
+            self._subscribers.pop(task_id, None)
+            self._conditions.pop(task_id, None)
+            self._wake_pending.discard(task_id)
 
 
 # Singleton instance
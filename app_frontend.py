@@ -1,11 +1,48 @@
 import streamlit as st
 import requests
+import httpx
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+from urllib3.util.retry import Retry
 import time
-import json
+import orjson
+import html
+import asyncio
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 API_BASE_URL = "http://127.0.0.1:8000/api"
 
+# One pooled session for every API call, so reruns reuse kept-alive
+# connections instead of opening a new socket per request. Streamlit
+# re-executes this script on each rerun, hence cache_resource.
+@st.cache_resource
+def _get_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.2))
+    session.mount("http://", adapter)
+    return session
+
+_session = _get_session()
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Uploads run here so the page keeps rendering while the bytes are sent
+@st.cache_resource
+def _get_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+# Task progress streams all run on one background event loop with a shared
+# async client, instead of a blocked thread per open stream
+@st.cache_resource
+def _get_stream_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=120.0))
+    return loop, client
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="RAG Knowledge Base",
@@ -15,7 +52,7 @@ st.set_page_config(
 )
 
 # --- Custom CSS for Modern Dark Theme ---
-st.markdown("""
+_CSS = """
 <style>
     /* Import Google Font */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -208,92 +245,330 @@ st.markdown("""
         border: none;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Sent as raw HTML rather than through the markdown renderer. It still has to
+# be emitted on every run: Streamlit drops elements a rerun doesn't redraw,
+# so caching the call would leave later reruns unstyled.
+st.html(_CSS)
+
+_METRIC_CARD = '<div class="metric-card"{style}><div class="metric-value">{value}</div><div class="metric-label">{label}</div></div>'
 
 # --- Session State Initialization ---
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "chat_history_md" not in st.session_state:
+    # Past turns as one markdown string, appended to as messages arrive
+    st.session_state.chat_history_md = ""
 if "active_tasks" not in st.session_state:
     st.session_state.active_tasks = {}
+if "current_task_id" not in st.session_state:
+    st.session_state.current_task_id = None
 
 # --- Helper Functions ---
 
+# Streamlit reruns the whole script on every interaction; these short-lived
+# caches keep the sidebar and status page from refetching on each rerun.
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_stats():
+    response = _session.get(f"{API_BASE_URL}/stats", timeout=3)
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_components():
+    response = _session.get(f"{API_BASE_URL}/components/status", timeout=3)
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 def get_vector_store_count():
     """Get the number of documents in the vector store."""
     try:
-        response = requests.get(f"{API_BASE_URL}/stats", timeout=3)
-        if response.status_code == 200:
-            return response.json().get("vector_store_count", 0)
+        return (_pushed_stats() or _fetch_stats()).get("vector_store_count", 0)
     except:
         pass
     return 0
 
+def answer_stream(query, sources):
+    """
+    Yield answer text from /advanced_query/stream as it arrives, for
+    st.write_stream. The sources frame is collected into `sources`.
+    """
+    url = f"{API_BASE_URL}/advanced_query/stream"
+    
+    with _session.get(url, params={"query": query}, stream=True, timeout=60, headers={"Accept": "text/event-stream"}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith(b"data: "):
+                event = orjson.loads(line[6:])
+                if "sources" in event:
+                    sources.extend(event["sources"])
+                else:
+                    yield event.get("delta", "")
+
+def _json_block(obj):
+    """Static code block instead of st.json's interactive tree, which is slow to render."""
+    st.code(orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode(), language="json")
+
+def format_score(doc):
+    score = doc.get('score', doc.get('similarity_score', 'N/A'))
+    if isinstance(score, float):
+        score = f"{score:.2%}"
+    return score
+
+def _format_doc(index, content, score, metadata):
+    """Collapsible HTML block for one retrieved document."""
+    block = (
+        f"<details><summary>📄 Source {index} • Relevance: {score}</summary>"
+        f"<p><b>Content:</b></p><p>{html.escape(content)}</p>"
+    )
+    if metadata:
+        block += f"<p><small>Metadata:</small></p><pre>{html.escape(orjson.dumps(metadata, option=orjson.OPT_INDENT_2, default=str).decode())}</pre>"
+    return block + "</details>"
+
+def docs_html(docs):
+    return "".join(
+        _format_doc(i + 1, str(doc.get('content', 'No content')), format_score(doc), doc.get('metadata'))
+        for i, doc in enumerate(docs)
+    )
+
+def history_markdown(msg):
+    """
+    Markdown for one finished chat turn. The history is replayed as a single
+    markdown element instead of one st.chat_message per turn; sources go in
+    collapsed <details> blocks.
+    """
+    who = "🧑 **You**" if msg["role"] == "user" else "🤖 **Assistant**"
+    # The block is rendered with unsafe_allow_html, so escape the query/answer
+    # text: answers are built from crawled pages and must not inject HTML
+    entry = f"{who}\n\n{html.escape(msg['content'], quote=False)}\n\n"
+    if msg.get("sources"):
+        entry += f"<details><summary>📚 View Sources</summary>{docs_html(msg['sources'])}</details>\n\n"
+    return entry + '<hr class="gradient-divider">\n\n'
+
 def format_docs_display(docs):
     """Helper to display retrieved documents cleanly."""
     if not docs:
         st.info("📭 No sources returned.")
         return
-        
-    for i, doc in enumerate(docs):
-        score = doc.get('score', doc.get('similarity_score', 'N/A'))
-        if isinstance(score, float):
-            score = f"{score:.2%}"
-        with st.expander(f"📄 Source {i+1} • Relevance: {score}"):
-            st.markdown(f"**Content:**\n\n{doc.get('content', 'No content')}")
-            if doc.get('metadata'):
-                st.caption("Metadata:")
-                st.json(doc.get('metadata', {}))
-
-def stream_task_updates(task_id, container):
+    
+    # One element for all documents instead of an expander (plus markdown and
+    # json widgets) per document
+    st.markdown(docs_html(docs), unsafe_allow_html=True)
+
+async def _sse(task_id, events):
     """
-    Connects to the SSE endpoint and updates the UI container in real-time.
+    Put each task snapshot from the SSE endpoint on the events queue as it
+    arrives. An exception is queued on failure; None always marks the end.
     """
     url = f"{API_BASE_URL}/tasks/{task_id}/stream"
+    _, client = _get_stream_loop()
     
     try:
-        container.info(f"🔌 Connecting to task stream...")
-        
-        with requests.get(url, stream=True, timeout=120) as response:
+        async with client.stream("GET", url, headers={"Accept": "text/event-stream", "Accept-Encoding": "gzip", "Cache-Control": "no-cache"}) as response:
             if response.status_code != 200:
-                container.error(f"Failed to connect: {response.status_code}")
-                return None
+                raise RuntimeError(f"Failed to connect: {response.status_code}")
 
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8')
-                    
-                    if decoded_line.startswith("data: "):
-                        json_str = decoded_line.replace("data: ", "", 1)
-                        try:
-                            data = json.loads(json_str)
-                            status = data.get("status")
-                            progress = data.get("progress", {})
-                            current_step = progress.get("current_step", "Processing...")
-                            percentage = progress.get("percentage", 0)
-                            
-                            if status == "pending":
-                                container.info(f"⏳ **Pending:** {current_step}")
-                            elif status == "processing":
-                                container.warning(f"⚙️ **Processing ({percentage:.0f}%):** {current_step}")
-                            elif status == "completed":
-                                container.success("✅ **Task Completed Successfully!**")
-                                result = data.get("result")
-                                if result:
-                                    with container.expander("📋 View Result"):
-                                        st.json(result)
-                                return "completed"
-                            elif status == "failed":
-                                container.error(f"❌ **Failed:** {data.get('error', 'Unknown error')}")
-                                return "failed"
-                                
-                        except json.JSONDecodeError:
-                            continue
-                            
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    try:
+                        events.put(orjson.loads(line[6:]))
+                    except orjson.JSONDecodeError:
+                        continue
+    except Exception as e:
+        events.put(e)
+    finally:
+        events.put(None)
+
+def _open_task_stream(task_id):
+    """Start streaming a task in the background; returns (events queue, future)."""
+    loop, _ = _get_stream_loop()
+    events = queue.Queue()
+    return events, asyncio.run_coroutine_threadsafe(_sse(task_id, events), loop)
+
+def _close_task_stream(task_id):
+    stream = st.session_state.pop(f"sse_{task_id}", None)
+    if stream is not None:
+        stream[1].cancel()
+
+async def _stats_sse(latest):
+    """Keep the newest /stats/stream snapshot in `latest`, reconnecting if the API goes away."""
+    _, client = _get_stream_loop()
+    while True:
+        try:
+            async with client.stream("GET", f"{API_BASE_URL}/stats/stream", headers={"Accept": "text/event-stream", "Accept-Encoding": "gzip"}) as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        latest.append(orjson.loads(line[6:]))
+        except Exception:
+            pass
+        # Stale while disconnected; readers fall back to fetching
+        latest.clear()
+        await asyncio.sleep(2)
+
+@st.cache_resource
+def _stats_feed():
+    """One stats subscription for the whole app, shared by every session."""
+    loop, _ = _get_stream_loop()
+    latest = deque(maxlen=1)
+    asyncio.run_coroutine_threadsafe(_stats_sse(latest), loop)
+    return latest
+
+def _pushed_stats():
+    try:
+        return _stats_feed()[-1]
+    except IndexError:
+        return None
+
+def render_task_event(data, container):
+    """Show one task snapshot in the container; returns the task status."""
+    status = data.get("status")
+    progress = data.get("progress", {})
+    current_step = progress.get("current_step", "Processing...")
+    percentage = progress.get("percentage", 0)
+    total_items = progress.get("total_items", 0)
+    if total_items > 1:
+        current_step = f"{current_step} ({progress.get('items_processed', 0)}/{total_items})"
+    
+    if status == "pending":
+        container.info(f"⏳ **Pending:** {current_step}")
+    elif status == "processing":
+        container.warning(f"⚙️ **Processing ({percentage:.0f}%):** {current_step}")
+    elif status == "completed":
+        container.success("✅ **Task Completed Successfully!**")
+        result = data.get("result")
+        if result:
+            with container.expander("📋 View Result"):
+                _json_block(result)
+    elif status == "failed":
+        container.error(f"❌ **Failed:** {data.get('error', 'Unknown error')}")
+    return status
+
+@st.fragment
+def task_progress_fragment():
+    """
+    Live progress for st.session_state.current_task_id. Drains the events
+    the background stream has queued and reruns only this fragment until the
+    task finishes, so the rest of the page stays responsive during long ingests.
+    """
+    upload = st.session_state.get("upload_future")
+    if upload is not None:
+        st.info("📤 Uploading...")
+        progress = st.session_state.get("upload_progress")
+        if progress:
+            st.progress(min(1.0, progress["sent"] / max(1, progress["total"])), text=f"{progress['sent'] / 1e6:.1f} / {progress['total'] / 1e6:.1f} MB")
+        if upload.done():
+            # Full rerun: the page turns the response into a task
+            st.rerun()
+        time.sleep(0.2)
+        st.rerun(scope="fragment")
+
+    tid = st.session_state.get("current_task_id")
+    if not tid:
+        return
+
+    st.info(f"🆔 Task: `{tid[:12]}...`")
+    status_container = st.empty()
+    events_key, last_key = f"sse_{tid}", f"sse_last_{tid}"
+
+    # Redraw the last event while waiting for the next one
+    last = st.session_state.get(last_key)
+    if last is not None and render_task_event(last, status_container) in ["completed", "failed"]:
+        return
+
+    stream = st.session_state.get(events_key)
+    if stream is None:
+        if last is None:
+            status_container.info(f"🔌 Connecting to task stream...")
+        stream = st.session_state[events_key] = _open_task_stream(tid)
+
+    # Take whatever arrived since the last run; only the newest snapshot is drawn
+    events, data, ended = stream[0], None, False
+    while True:
+        try:
+            item = events.get_nowait()
+        except queue.Empty:
+            break
+        if item is None:
+            ended = True
+            break
+        if isinstance(item, Exception):
+            _close_task_stream(tid)
+            status_container.error(f"⚠️ Stream error: {item}")
+            return
+        data = item
+
+    if data is not None:
+        st.session_state[last_key] = data
+        status = render_task_event(data, status_container)
+        if status in ["completed", "failed"]:
+            _close_task_stream(tid)
+            if tid in st.session_state.active_tasks:
+                st.session_state.active_tasks[tid]["status"] = status
+            # Full rerun so Task History picks up the final status
+            st.rerun()
+
+    if ended:
+        _close_task_stream(tid)
+        return
+
+    time.sleep(0.25)
+    st.rerun(scope="fragment")
+
+@st.fragment(run_every=1.0)
+def system_status_fragment():
+    """
+    Stats and component status for the System Status page, redrawn from the
+    pushed /stats/stream snapshot; fetched directly until the feed connects.
+    """
+    pushed = _pushed_stats()
+    
+    col1, col2, col3 = st.columns(3)
+    
+    try:
+        stats = pushed or _fetch_stats()
+        if stats:
+            doc_count = stats.get("vector_store_count", 0)
+            
+            with col1:
+                st.markdown(_METRIC_CARD.format(style="", value=f"{doc_count:,}", label="📄 Indexed Chunks"), unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown(_METRIC_CARD.format(style="", value="✅", label="🔌 API Status"), unsafe_allow_html=True)
+            
+            with col3:
+                st.markdown(_METRIC_CARD.format(style="", value="💾", label="Data Persisted"), unsafe_allow_html=True)
+            
+            st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
+            
+            # Additional info
+            st.markdown("### 📈 Details")
+            with st.expander("Document Loader Stats"):
+                _json_block(stats.get("document_loader_stats", {}))
+                
     except Exception as e:
-        container.error(f"⚠️ Stream error: {e}")
-        return "error"
+        st.error(f"⚠️ Could not fetch stats: {e}")
+    
+    st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
+    
+    # Component status
+    st.markdown("### 🔧 Component Status")
+    try:
+        components = pushed["components"] if pushed else _fetch_components()
+        if components:
+            for name, status in components.items():
+                is_init = status.get("initialized", False)
+                error = status.get("error")
+                if is_init:
+                    st.success(f"✅ **{name.replace('_', ' ').title()}**: Initialized")
+                elif error:
+                    st.error(f"❌ **{name.replace('_', ' ').title()}**: {error}")
+                else:
+                    st.warning(f"⏳ **{name.replace('_', ' ').title()}**: Not yet initialized (loads on first use)")
+    except:
+        st.warning("Could not fetch component status")
+    
+    st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
 
 # --- Sidebar ---
 with st.sidebar:
@@ -302,12 +577,7 @@ with st.sidebar:
     # Connection status
     
     doc_count = get_vector_store_count()
-    st.markdown(f"""
-        <div class="metric-card" style="margin-top: 1rem;">
-        <div class="metric-value">{doc_count:,}</div>
-        <div class="metric-label">📚 Indexed Documents</div>
-    </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_METRIC_CARD.format(style=' style="margin-top: 1rem;"', value=f"{doc_count:,}", label="📚 Indexed Documents"), unsafe_allow_html=True)
     
     st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
     
@@ -336,6 +606,7 @@ if page == "💬 Chat & Search":
     with col2:
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.chat_history = []
+            st.session_state.chat_history_md = ""
             st.rerun()
     
     st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
@@ -343,56 +614,56 @@ if page == "💬 Chat & Search":
     # Chat display
     chat_container = st.container()
     with chat_container:
-        for msg in st.session_state.chat_history:
-            with st.chat_message(msg["role"], avatar="🧑" if msg["role"] == "user" else "🤖"):
-                st.markdown(msg["content"])
-                if "sources" in msg and msg["sources"]:
-                    with st.expander("📚 View Sources", expanded=False):
-                        format_docs_display(msg["sources"])
+        if st.session_state.chat_history_md:
+            st.markdown(st.session_state.chat_history_md, unsafe_allow_html=True)
     
     # Chat input
     if query := st.chat_input("Ask a question about your documents..."):
-        st.session_state.chat_history.append({"role": "user", "content": query})
+        user_msg = {"role": "user", "content": query}
+        st.session_state.chat_history.append(user_msg)
+        st.session_state.chat_history_md += history_markdown(user_msg)
         
         with st.chat_message("user", avatar="🧑"):
             st.markdown(query)
         
         with st.chat_message("assistant", avatar="🤖"):
-            with st.spinner("🔄 Thinking..."):
-                try:
-                    params = {"query": query}
-                    answer = ""
-                    sources = []
-                    
-                    if "Advanced" in search_mode:
-                        res = requests.get(f"{API_BASE_URL}/advanced_query", params=params, timeout=60)
-                        data = res.json()
-                        answer = data.get("response", {}).get("answer", "No answer generated.")
-                        sources = data.get("response", {}).get("sources", [])
-                    elif "Standard" in search_mode:
-                        res = requests.get(f"{API_BASE_URL}/rag_search", params=params, timeout=30)
-                        sources = res.json()
-                        answer = "📄 **Here are the most relevant documents:**" if sources else "No relevant documents found."
-                    else:  # LLM Direct
-                        res = requests.get(f"{API_BASE_URL}/llm_search", params=params, timeout=60)
-                        answer = res.json() if isinstance(res.json(), str) else str(res.json())
+            try:
+                params = {"query": query}
+                answer = ""
+                sources = []
+                
+                if "Advanced" in search_mode:
+                    # Tokens are drawn as the server streams them
+                    answer = st.write_stream(answer_stream(query, sources)) or "No answer generated."
+                else:
+                    with st.spinner("🔄 Thinking..."):
+                        if "Standard" in search_mode:
+                            res = _session.get(f"{API_BASE_URL}/rag_search", params=params, timeout=30)
+                            sources = orjson.loads(res.content)
+                            answer = "📄 **Here are the most relevant documents:**" if sources else "No relevant documents found."
+                        else:  # LLM Direct
+                            res = _session.get(f"{API_BASE_URL}/llm_search", params=params, timeout=60)
+                            data = orjson.loads(res.content)
+                            answer = data if isinstance(data, str) else str(data)
                     
                     st.markdown(answer)
-                    
-                    if sources:
-                        with st.expander("📚 View Sources", expanded=False):
-                            format_docs_display(sources)
-                    
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "content": answer,
-                        "sources": sources
-                    })
-                    
-                except requests.exceptions.Timeout:
-                    st.error("⏱️ Request timed out. The server might be loading models. Please try again.")
-                except Exception as e:
-                    st.error(f"❌ Error: {e}")
+                
+                if sources:
+                    with st.expander("📚 View Sources", expanded=False):
+                        format_docs_display(sources)
+                
+                assistant_msg = {
+                    "role": "assistant",
+                    "content": answer,
+                    "sources": sources
+                }
+                st.session_state.chat_history.append(assistant_msg)
+                st.session_state.chat_history_md += history_markdown(assistant_msg)
+                
+            except requests.exceptions.Timeout:
+                st.error("⏱️ Request timed out. The server might be loading models. Please try again.")
+            except Exception as e:
+                st.error(f"❌ Error: {e}")
 
 # ==========================================
 # PAGE 2: DATA INGESTION
@@ -413,6 +684,7 @@ elif page == "📥 Data Ingestion":
         )
         
         task_response = None
+        task_type = ingest_type
         new_task_id = None
         
         if "PDF" in ingest_type:
@@ -423,65 +695,89 @@ elif page == "📥 Data Ingestion":
                 help="Upload one or more PDF files to index"
             )
             if st.button("🚀 Upload & Process", disabled=not files, use_container_width=True):
-                with st.spinner("📤 Uploading..."):
-                    files_list = [("files", (f.name, f, "application/pdf")) for f in files]
-                    task_response = requests.post(f"{API_BASE_URL}/upload/pdfs/async", files=files_list)
+                # Send in the background; Live Progress shows the upload and then the task
+                # Stream the multipart body from the uploaded files in chunks
+                # instead of building it in memory first
+                for f in files:
+                    f.seek(0)
+                encoder = MultipartEncoder(fields=[("files", (f.name, f, "application/pdf")) for f in files])
+                upload_progress = {"sent": 0, "total": encoder.len}
+                
+                def on_read(monitor):
+                    upload_progress["sent"] = monitor.bytes_read
+                
+                monitor = MultipartEncoderMonitor(encoder, on_read)
+                st.session_state.upload_progress = upload_progress
+                st.session_state.upload_future = _get_executor().submit(
+                    _session.post, f"{API_BASE_URL}/upload/pdfs/async",
+                    data=monitor, headers={"Content-Type": monitor.content_type}
+                )
+                st.session_state.upload_type = ingest_type
+                st.rerun()
         
         elif "CSV" in ingest_type:
             f = st.file_uploader("Drop CSV file here", type=['csv'])
             delim = st.text_input("Delimiter", ",", help="Character used to separate values")
             if st.button("🚀 Upload", disabled=not f, use_container_width=True):
                 with st.spinner("📤 Ingesting..."):
-                    res = requests.post(
+                    res = _session.post(
                         f"{API_BASE_URL}/upload/csv",
                         files={"file": (f.name, f, "text/csv")},
                         data={"delimiter": delim}
                     )
                     if res.status_code == 200:
                         st.success("✅ CSV Ingested Successfully!")
-                        st.json(res.json())
+                        _json_block(orjson.loads(res.content))
                     else:
                         st.error(f"❌ Error: {res.text}")
         
         elif "Single" in ingest_type:
             url = st.text_input("Enter URL", placeholder="https://example.com/page")
             if st.button("🚀 Ingest", disabled=not url, use_container_width=True):
-                task_response = requests.post(f"{API_BASE_URL}/ingest/webpage/async", json={"url": url})
+                task_response = _session.post(f"{API_BASE_URL}/ingest/webpage/async", data=orjson.dumps({"url": url}), headers=_JSON_HEADERS)
         
         elif "Recursive" in ingest_type:
             base_url = st.text_input("Base URL", placeholder="https://docs.example.com")
             depth = st.slider("Crawl Depth", 1, 5, 2, help="How many levels deep to crawl")
             if st.button("🚀 Start Crawl", disabled=not base_url, use_container_width=True):
-                task_response = requests.post(
+                task_response = _session.post(
                     f"{API_BASE_URL}/ingest/recursive/async",
-                    json={"base_url": base_url, "max_depth": depth}
+                    data=orjson.dumps({"base_url": base_url, "max_depth": depth}),
+                    headers=_JSON_HEADERS
                 )
         
+        # Pick up a finished background upload
+        upload = st.session_state.get("upload_future")
+        if upload is not None and upload.done():
+            del st.session_state.upload_future
+            st.session_state.pop("upload_progress", None)
+            task_type = st.session_state.pop("upload_type", ingest_type)
+            try:
+                task_response = upload.result()
+            except Exception as e:
+                st.error(f"❌ Upload failed: {e}")
+        
         # Handle task creation
         if task_response:
             if task_response.status_code == 200:
-                data = task_response.json()
+                data = orjson.loads(task_response.content)
                 new_task_id = data.get("task_id")
                 if new_task_id:
                     st.session_state.active_tasks[new_task_id] = {
-                        "type": ingest_type,
+                        "type": task_type,
                         "start_time": time.time(),
                         "status": "pending"
                     }
+                    # Drop the stream of the task we were watching before
+                    _close_task_stream(st.session_state.get("current_task_id"))
+                    st.session_state.current_task_id = new_task_id
             else:
                 st.error(f"❌ Failed: {task_response.text}")
     
     with col2:
         st.markdown("### 📡 Live Progress")
         
-        if new_task_id:
-            st.info(f"🆔 Task: `{new_task_id[:12]}...`")
-            status_container = st.empty()
-            final_status = stream_task_updates(new_task_id, status_container)
-            
-            if final_status in ["completed", "failed"]:
-                if new_task_id in st.session_state.active_tasks:
-                    st.session_state.active_tasks[new_task_id]["status"] = final_status
+        task_progress_fragment()
         
         st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
         st.markdown("### 📋 Task History")
@@ -489,19 +785,39 @@ elif page == "📥 Data Ingestion":
         if not st.session_state.active_tasks:
             st.caption("No tasks yet. Upload something to get started!")
         else:
-            for tid, info in list(st.session_state.active_tasks.items()):
-                status_emoji = {
-                    "pending": "⏳",
-                    "processing": "⚙️",
-                    "completed": "✅",
-                    "failed": "❌"
-                }.get(info.get("status"), "❓")
-                
-                with st.expander(f"{status_emoji} {info['type']} ({tid[:8]}...)"):
-                    st.write(f"**Status:** {info.get('status', 'Unknown').title()}")
-                    if st.button("🗑️ Remove", key=f"del_{tid}"):
-                        del st.session_state.active_tasks[tid]
-                        st.rerun()
+            # The whole list is one element, rebuilt only when a task is added,
+            # removed or changes status
+            history_key = tuple((tid, info.get("status")) for tid, info in st.session_state.active_tasks.items())
+            if st.session_state.get("task_history_key") != history_key:
+                rows = []
+                for tid, info in st.session_state.active_tasks.items():
+                    status_emoji = {
+                        "pending": "⏳",
+                        "processing": "⚙️",
+                        "completed": "✅",
+                        "failed": "❌"
+                    }.get(info.get("status"), "❓")
+                    rows.append(
+                        f"<details><summary>{status_emoji} {html.escape(info['type'])} ({tid[:8]}...)</summary>"
+                        f"<p><b>Status:</b> {info.get('status', 'Unknown').title()}</p></details>"
+                    )
+                st.session_state.task_history_html = "".join(rows)
+                st.session_state.task_history_key = history_key
+            st.markdown(st.session_state.task_history_html, unsafe_allow_html=True)
+            
+            # One form instead of a Remove button per task; only submitting it reruns
+            with st.form("remove_tasks", border=False):
+                to_remove = st.multiselect(
+                    "Remove tasks",
+                    list(st.session_state.active_tasks),
+                    format_func=lambda tid: f"{st.session_state.active_tasks[tid]['type']} ({tid[:8]}...)",
+                    placeholder="Select tasks to remove",
+                    label_visibility="collapsed"
+                )
+                if st.form_submit_button("🗑️ Remove", use_container_width=True) and to_remove:
+                    for tid in to_remove:
+                        st.session_state.active_tasks.pop(tid, None)
+                    st.rerun()
 
 # ==========================================
 # PAGE 3: SYSTEM STATUS
@@ -510,69 +826,7 @@ elif page == "📊 System Status":
     st.markdown('<p class="main-header">📊 System Overview</p>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Monitor your RAG pipeline status</p>', unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
-    
-    try:
-        res = requests.get(f"{API_BASE_URL}/stats", timeout=5)
-        if res.status_code == 200:
-            stats = res.json()
-            doc_count = stats.get("vector_store_count", 0)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{doc_count:,}</div>
-                    <div class="metric-label">📄 Indexed Chunks</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">✅</div>
-                    <div class="metric-label">🔌 API Status</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">💾</div>
-                    <div class="metric-label">Data Persisted</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
-            
-            # Additional info
-            st.markdown("### 📈 Details")
-            with st.expander("Document Loader Stats"):
-                st.json(stats.get("document_loader_stats", {}))
-                
-    except Exception as e:
-        st.error(f"⚠️ Could not fetch stats: {e}")
-    
-    st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
-    
-    # Component status
-    st.markdown("### 🔧 Component Status")
-    try:
-        comp_res = requests.get(f"{API_BASE_URL}/components/status", timeout=5)
-        if comp_res.status_code == 200:
-            components = comp_res.json()
-            for name, status in components.items():
-                is_init = status.get("initialized", False)
-                error = status.get("error")
-                if is_init:
-                    st.success(f"✅ **{name.replace('_', ' ').title()}**: Initialized")
-                elif error:
-                    st.error(f"❌ **{name.replace('_', ' ').title()}**: {error}")
-                else:
-                    st.warning(f"⏳ **{name.replace('_', ' ').title()}**: Not yet initialized (loads on first use)")
-    except:
-        st.warning("Could not fetch component status")
-    
-    st.markdown('<hr class="gradient-divider">', unsafe_allow_html=True)
+    system_status_fragment()
     
     # Danger zone
     st.markdown("### ⚠️ Danger Zone")
@@ -580,13 +834,17 @@ elif page == "📊 System Status":
         st.warning("This will permanently delete all indexed documents from the vector store.")
         if st.button("🗑️ Clear Database", type="primary", use_container_width=True):
             try:
-                res = requests.delete(f"{API_BASE_URL}/clear")
+                res = _session.delete(f"{API_BASE_URL}/clear")
                 if res.status_code == 200:
-                    st.success("✅ Database cleared!")
-                    time.sleep(1)
+                    _fetch_stats.clear()
+                    _fetch_components.clear()
+                    # A toast survives the rerun, so no need to pause for the message
+                    st.toast("✅ Database cleared!")
                     st.rerun()
             except Exception as e:
                 st.error(f"Error: {e}")
     
     if st.button("🔄 Refresh", use_container_width=True):
+        _fetch_stats.clear()
+        _fetch_components.clear()
         st.rerun()
\ No newline at end of file
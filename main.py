@@ -17,6 +17,12 @@ if __name__ == "__main__":
             "app.main:app",
             host="0.0.0.0",
             port=8000,
+            # Plain asyncio loop: WebLoader calls nest_asyncio.apply(), which
+            # can't patch uvloop. "auto" picks httptools when it is installed.
+            loop="asyncio",
+            http="auto",
+            # Single worker: task progress lives in the in-process TaskManager
+            workers=1,
             reload=False,  # Disabled for better Ctrl+C handling on Windows
             log_level="info"
         )